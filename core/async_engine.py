@@ -0,0 +1,264 @@
+# core/async_engine.py
+
+import asyncio
+import contextlib
+import threading
+from urllib.parse import urlparse
+
+import aiohttp
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from core.scraper import normalize_url, prepare_headers, extract_from_bytes
+from core.results import count_results
+from core import http_cache
+from core import fingerprint
+from core import snapshot_store
+
+STATUS_SUCCESS = "✅ Успешно"
+STATUS_ERROR = "❌ Ошибка"
+STATUS_STOPPED = "⏸️ Остановлено"
+
+
+class AsyncScrapeEngine(QObject):
+    """
+    Альтернатива TaskWorker: все запросы выполняются на одном asyncio-цикле
+    в фоновом потоке, с общим лимитом параллельности и лимитом на хост.
+    Результаты копятся и отдаются в Qt-поток пачками через batch_finished.
+    """
+
+    # [(task_id, status, message, results, cookies), ...]
+    batch_finished = pyqtSignal(list)
+
+    def __init__(self, max_concurrency=100, per_host_limit=6, batch_interval=0.1, parse_in_process=False, css_engine="lxml", use_cache=False, fingerprints=None, snapshots=False, include_html=False, parent=None):
+        super().__init__(parent)
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.batch_interval = batch_interval
+        self.parse_in_process = parse_in_process
+        self.css_engine = css_engine
+        self.use_cache = use_cache
+        self.fingerprints = fingerprints if fingerprints is not None else {}
+        self.snapshots = snapshots
+        self.include_html = include_html
+
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._global_sem = None
+        self._host_sems = {}     # host -> [Semaphore, задач с этим хостом] (только из цикла)
+        self._futures = {}       # task_id -> concurrent.futures.Future
+        self._futures_lock = threading.Lock()
+        self._buffer = []        # готовые результаты, ждут отправки в UI
+        self._flush_scheduled = False
+
+    # ============================
+    # 🔹 Управление циклом
+    # ============================
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="AsyncScrapeEngine", daemon=True)
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._global_sem = asyncio.Semaphore(self.max_concurrency)
+        self._loop.run_forever()
+
+    def shutdown(self):
+        """Отменяет все задачи, закрывает HTTP-сессию и останавливает цикл."""
+        if not self._loop:
+            return
+
+        self.cancel_all()
+        future = asyncio.run_coroutine_threadsafe(self._close_session(), self._loop)
+        try:
+            future.result(timeout=5)
+        except Exception:
+            pass
+
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+        self._thread = None
+
+    # ============================
+    # 🔹 Публичное API
+    # ============================
+
+    def submit(self, task_id, url, selector, method, params=None, cookies=None):
+        """Ставит задачу в цикл. Повторный submit той же строки отменяет предыдущий запуск."""
+        self.start()
+        self.cancel(task_id)
+
+        coro = self._run_task(task_id, url, selector, method, params or {}, cookies or {})
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        with self._futures_lock:
+            self._futures[task_id] = future
+        future.add_done_callback(lambda f, t=task_id, c=cookies or {}: self._done(t, c, f))
+
+    def cancel(self, task_id):
+        with self._futures_lock:
+            future = self._futures.pop(task_id, None)
+        if future:
+            future.cancel()
+
+    def cancel_all(self):
+        with self._futures_lock:
+            task_ids = list(self._futures)
+        for task_id in task_ids:
+            self.cancel(task_id)
+
+    def _done(self, task_id, cookies, future):
+        with self._futures_lock:
+            if self._futures.get(task_id) is future:
+                self._futures.pop(task_id, None)
+
+        # Отмена приходит и до старта корутины (тогда она сама ничего не отправит), поэтому STOPPED — отсюда
+        if future.cancelled() and self._loop:
+            self._loop.call_soon_threadsafe(self._stopped, task_id, cookies)
+
+    def _stopped(self, task_id, cookies):
+        # Результаты задачи станут пустыми — отпечаток прошлого успеха больше не годится
+        self.fingerprints.pop(task_id, None)
+        self._push((task_id, STATUS_STOPPED, "Задача отменена", [], cookies))
+
+    # ============================
+    # 🔹 Выполнение (внутри цикла)
+    # ============================
+
+    async def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.per_host_limit)
+            # Куки передаются для каждой задачи отдельно, общий jar не нужен
+            self._session = aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar())
+        return self._session
+
+    async def _close_session(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+    @contextlib.asynccontextmanager
+    async def _host_slot(self, url):
+        """Лимит на хост; запись хоста удаляется, когда с ним не остаётся ни работающих, ни ждущих задач"""
+        host = urlparse(url).netloc.lower()
+        entry = self._host_sems.get(host)
+        if entry is None:
+            entry = self._host_sems[host] = [asyncio.Semaphore(self.per_host_limit), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._host_sems[host]
+
+    async def _run_task(self, task_id, url, selector, method, params, cookies):
+        url = normalize_url(url)
+        use_xpath = method.lower() == "xpath"
+
+        try:
+            async with self._global_sem, self._host_slot(url):
+                body, encoding, final_cookies = await self._fetch(url, params, cookies)
+
+            changed_cookies = final_cookies if final_cookies != cookies else {}
+
+            # Тело не изменилось с прошлого запуска — не разбираем страницу
+            previous = self.fingerprints.get(task_id)
+            current = fingerprint.page_fingerprint(body, selector, method, self.css_engine, include_html=self.include_html)
+            if self.snapshots:
+                # Запись снимка (gzip + файлы) — в пул потоков, цикл не ждёт диск
+                await self._loop.run_in_executor(None, snapshot_store.store.save, url, body, encoding, current["body"])
+            if fingerprint.same_page(previous, current):
+                self._push((task_id, fingerprint.STATUS_UNCHANGED, "Страница не изменилась", None, changed_cookies))
+                return
+
+            # Разбор HTML — CPU-работа, уводим её с цикла в пул потоков (или процессов)
+            executor = None
+            if self.parse_in_process:
+                from core import parse_pool
+                executor = parse_pool.get_executor()
+            results = await self._loop.run_in_executor(
+                executor, extract_from_bytes, body, encoding, url, selector, use_xpath, self.css_engine, self.include_html
+            )
+
+            current["results"] = fingerprint.results_hash(results)
+            unchanged = fingerprint.same_results(previous, current)
+            self.fingerprints[task_id] = current
+
+            if unchanged:
+                self._push((task_id, fingerprint.STATUS_UNCHANGED, "Результаты не изменились", None, changed_cookies))
+                return
+
+            found = count_results(results)
+            message = f"Найдено элементов: {found}" if found else "Элементов не найдено"
+            self._push((task_id, STATUS_SUCCESS, message, results, final_cookies))
+
+        except Exception as e:
+            # CancelledError сюда не попадает: STOPPED отправляет _done
+            self.fingerprints.pop(task_id, None)
+            self._push((task_id, STATUS_ERROR, str(e) or e.__class__.__name__, [], cookies))
+
+    async def _fetch(self, url, params, cookies, conditional=True):
+        session = await self._get_session()
+        headers = prepare_headers(params.get("headers"), params.get("user_agent"))
+        timeout = aiohttp.ClientTimeout(total=params.get("timeout", 10))
+
+        # Валидаторы из кэша: сервер ответит 304, если страница не менялась
+        # Файлы кэша читаются и пишутся в пуле потоков, чтобы цикл не ждал диск
+        request_headers = dict(headers)
+        if self.use_cache:
+            cache_key = http_cache.request_key(url, headers, cookies, params.get("proxy"))
+            if conditional:
+                request_headers.update(await self._loop.run_in_executor(None, http_cache.cache.conditional_headers, cache_key))
+
+        async with session.get(
+            url,
+            headers=request_headers,
+            proxy=params.get("proxy") or None,
+            timeout=timeout,
+            cookies=cookies
+        ) as response:
+            response.raise_for_status()
+
+            final_cookies = dict(cookies)
+            for r in list(response.history) + [response]:
+                final_cookies.update({name: morsel.value for name, morsel in r.cookies.items()})
+
+            if self.use_cache and response.status == 304:
+                cached = await self._loop.run_in_executor(None, http_cache.cache.load, cache_key)
+                if cached is None:
+                    # Запись пропала между запросами — повторяем без валидаторов
+                    return await self._fetch(url, params, cookies, conditional=False)
+                body, encoding = cached
+                return body, encoding, final_cookies
+
+            body = await response.read()
+            encoding = response.get_encoding()
+
+        if self.use_cache:
+            await self._loop.run_in_executor(None, http_cache.cache.store, cache_key, url, response.headers, body, encoding)
+
+        return body, encoding, final_cookies
+
+    # ============================
+    # 🔹 Пакетная доставка в UI
+    # ============================
+
+    def _push(self, result):
+        self._buffer.append(result)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._loop.call_later(self.batch_interval, self._flush)
+
+    def _flush(self):
+        self._flush_scheduled = False
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        # Сигнал из чужого потока доставляется в Qt-поток через очередь событий
+        self.batch_finished.emit(batch)
@@ -0,0 +1,48 @@
+# core/export_worker.py
+
+import os
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from core.exporter import export_tasks
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class ExportWorker(QThread):
+    """
+    Пишет результаты нескольких задач в один файл (core.exporter.export_tasks) вне GUI-потока.
+    Отложенные результаты восстановленной сессии (LazyTaskResult) тоже подгружаются здесь.
+    """
+
+    progress = pyqtSignal(int, int)    # done, total
+    exported = pyqtSignal(str)         # file_path
+    failed = pyqtSignal(str)           # сообщение ("" — отменено пользователем)
+
+    def __init__(self, tasks, file_path):
+        super().__init__()
+        self.tasks = tasks  # снимок записей task_results на момент запуска
+        self.file_path = file_path
+
+    def run(self):
+        try:
+            export_tasks(self.tasks, self.file_path, progress=self._progress)
+        except ExportCancelled:
+            self._remove_partial()
+            self.failed.emit("")
+        except Exception as e:
+            self._remove_partial()
+            self.failed.emit(str(e) or e.__class__.__name__)
+        else:
+            self.exported.emit(self.file_path)
+
+    def _progress(self, done, total):
+        if self.isInterruptionRequested():
+            raise ExportCancelled()
+        self.progress.emit(done, total)
+
+    def _remove_partial(self):
+        if os.path.exists(self.file_path):
+            os.remove(self.file_path)
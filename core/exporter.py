@@ -1,29 +1,72 @@
+import csv
+import json
+import re
+from datetime import datetime
 from bs4 import BeautifulSoup
-import pandas as pd
+from lxml import etree, html as lxml_html
+from core.results import iter_results
+
+# Лимит строк листа Excel (.xlsx), включая заголовок
+EXCEL_MAX_ROWS = 1048576
+PROGRESS_STEP = 5000
 
 # EXTRACT LINK AND TEXT FROM HTML BACK IN LIST
 # EXTRACT LINK AND TEXT FROM HTML BACK IN LIST
 
+# Ссылка в том виде, в каком её пишет core.scraper: <a href="..." target="_blank">текст</a>
+ANCHOR_PATTERN = re.compile(r'^\s*<a href="([^"<>]*)" target="_blank">([^<>]*)</a>\s*$')
+
+
 def extract_link_and_text(html):
     """
     Извлекает чистый текст и ссылку из HTML.
     Возвращает словарь {"title": ..., "link": ..., "description": ...}
+    Ссылки, собранные скрапером, разбираются регуляркой; остальное — одним проходом lxml.
     """
-    soup = BeautifulSoup(html, 'html.parser')
-    a_tag = soup.find('a')
+    match = ANCHOR_PATTERN.match(html)
+    if match:
+        link, text = match.groups()
+        return {"title": _unescape(text).strip(), "link": _unescape(link), "description": None}
+
+    try:
+        root = lxml_html.fragment_fromstring(html, create_parent="div")
+    except (etree.ParserError, ValueError):
+        return {"title": html.strip(), "link": None, "description": None}
+
+    a_tag = root.find(".//a")
+    element = a_tag if a_tag is not None else root
+    return {
+        # Как get_text(strip=True): куски текста без крайних пробелов, склеенные подряд
+        "title": "".join(part.strip() for part in element.itertext()),
+        "link": a_tag.get("href") if a_tag is not None else None,
+        "description": None
+    }
 
-    if a_tag:
-        return {
-            "title": a_tag.get_text(strip=True),
-            "link": a_tag.get('href', None),
-            "description": None
-        }
-    else:
-        return {
-            "title": soup.get_text(strip=True),
-            "link": None,
-            "description": None
-        }
+
+def item_fields(item):
+    """
+    Title/Link/Description для экспорта из элемента результата:
+    записи core.scraper {"tag", "text", "href", ...} берутся как есть, без разбора HTML;
+    HTML-строки из старых сессий разбираются extract_link_and_text.
+    """
+    if isinstance(item, str):
+        return extract_link_and_text(item)
+    if "text" not in item:
+        return item  # уже {"title", "link", "description"}
+    return {"title": item.get("text"), "link": item.get("href"), "description": None}
+
+
+def item_text(item):
+    """Чистый текст элемента результата (записи или HTML-строки)"""
+    if isinstance(item, str):
+        return clean_html_tags(item)
+    return item.get("text") or item.get("title") or ""
+
+
+def _unescape(text):
+    if "&" not in text:
+        return text
+    return lxml_html.fromstring(f"<p>{text}</p>").text or ""
 
 # CLEAN HTML TAGS AND RETURN CLEAN TEXT
 # CLEAN HTML TAGS AND RETURN CLEAN TEXT
@@ -49,10 +92,26 @@ def save_as_default(url, results):
 
 def save_as_dynamic_tags(url, results, selector_input):
     """ Динамически группирует данные по тегам, убирая ненужное """
+    # Именованные селекторы уже сгруппированы по полям
+    if isinstance(results, dict):
+        return {
+            "url": url,
+            "data": {field: values for field, values in results.items() if values}
+        }
+
     selected_tags = [tag.strip() for tag in selector_input.split(",")]  # Получаем теги из input
     grouped_data = {tag: [] for tag in selected_tags}  # Динамически создаем структуру JSON
 
     for line in results:
+        # Запись core.scraper: тег известен, разбирать строку не нужно
+        if isinstance(line, dict):
+            tag = line.get("tag") or "text"
+            if tag == "a":
+                grouped_data.setdefault("a", []).append({"link_text": line.get("text"), "url": line.get("href")})
+            else:
+                grouped_data.setdefault(tag, []).append({"text": line.get("text")})
+            continue
+
         line = line.strip()
 
         # Фильтруем мусорные строки
@@ -84,6 +143,7 @@ def save_as_dynamic_tags(url, results, selector_input):
 # 📌 Функция для сохранения данных в виде статей
 
 def save_as_articles(url, results):
+    results = tagged_lines(results)
     articles = []
     current_article = {"title": "", "subtitles": [], "paragraphs": []}
 
@@ -110,12 +170,31 @@ def save_as_articles(url, results):
 # 📌 Функция для сохранения с привязкой к ссылкам
 
 def save_as_with_links(url, results):
-    clean_results = [item for item in results if item.get("link")]
+    clean_results = []
+    for _, item in iter_results(results):
+        item = item_fields(item)
+        if item.get("link"):
+            clean_results.append(item)
     return {
         "url": url,
         "data": clean_results
     }
 
+# 📌 Именованные поля → строки "поле: текст"
+# 📌 Именованные поля → строки "поле: текст"
+
+def tagged_lines(results):
+    """
+    Словарь {поле: [...]} или список записей превращает в строки вида "h1: текст",
+    как ждёт save_as_articles (для записи — её тег).
+    """
+    if isinstance(results, dict):
+        return [f"{field}: {item_text(item)}" for field, item in iter_results(results)]
+    return [
+        f"{item.get('tag') or 'text'}: {item_text(item)}" if isinstance(item, dict) else item
+        for item in results
+    ]
+
 # DICT WITH RESULTS AND JSON FORMAT FROM COMBOBOX
 # DICT WITH RESULTS AND JSON FORMAT FROM COMBOBOX
     
@@ -137,42 +216,254 @@ def export_data_to_json(parsed_data, format_type):
 
     return result_json
 
-# SAVING TO CSV TABLE
-# SAVING TO CSV TABLE
+# FLAT ROWS FOR CSV / EXCEL
+# FLAT ROWS FOR CSV / EXCEL
+
+# Колонки пакетного экспорта: Field есть всегда — иначе пришлось бы заранее прочитать результаты всех задач
+ROW_COLUMNS = ["URL", "Field", "Title", "Link", "Description"]
+
+
+class TaskResultPairs:
+    """
+    Пары (url, results) по записям task_results для save_to_csv / save_to_excel.
+    results задачи (LazyTaskResult) читается, только когда до неё дошла запись,
+    и не удерживается после — в памяти одновременно результаты одной задачи.
+    """
+
+    def __init__(self, tasks):
+        self.tasks = list(tasks)
 
-def save_to_csv(parsed_data, file_path):
-    """Сохраняет данные в CSV"""
-    rows = []
-    for url, data in parsed_data.items():
-        for item in data:
-            if isinstance(item, str):
-                item = extract_link_and_text(item)  # 🔥 Конвертируем строку в словарь
-            rows.append({
-                "URL": url,
+    def __len__(self):
+        return len(self.tasks)
+
+    def __iter__(self):
+        for task in self.tasks:
+            yield task.get("url", ""), task.get("results")
+
+
+def result_pairs(parsed_data):
+    """
+    Пары (url, results): parsed_data — словарь {url: results},
+    список пар (несколько задач с одним URL в одном файле) или TaskResultPairs.
+    """
+    return list(parsed_data.items()) if isinstance(parsed_data, dict) else parsed_data
+
+
+def row_columns(parsed_data):
+    """Колонки плоской таблицы; Field — только если есть именованные селекторы"""
+    if any(isinstance(data, dict) for _, data in result_pairs(parsed_data)):
+        return ROW_COLUMNS
+    return [column for column in ROW_COLUMNS if column != "Field"]
+
+
+def iter_rows(parsed_data):
+    """Плоские строки URL/Title/Link/Description (+ Field) по одной — без списка всех строк"""
+    for url, data in result_pairs(parsed_data):
+        for field, item in iter_results(data):
+            item = item_fields(item)  # 🔥 Запись / HTML-строка → Title, Link, Description
+            row = {"URL": url}
+            if field is not None:
+                row["Field"] = field
+            row.update({
                 "Title": item.get("title"),
                 "Link": item.get("link"),
                 "Description": item.get("description")
             })
+            yield row
 
-    df = pd.DataFrame(rows)
-    df.to_csv(file_path, index=False, encoding='utf-8-sig')
+
+def _rows_with_progress(parsed_data, progress=None):
+    """
+    iter_rows с progress(done, total) по задачам (парам url/results): после каждой задачи
+    и каждые PROGRESS_STEP строк внутри неё. Число задач известно заранее —
+    результаты не перебираются отдельным проходом ради подсчёта строк.
+    """
+    pairs = result_pairs(parsed_data)
+    total = len(pairs)
+    for done, pair in enumerate(pairs):
+        for rows, row in enumerate(iter_rows([pair]), 1):
+            yield row
+            if progress and rows % PROGRESS_STEP == 0:
+                progress(done, total)
+        if progress:
+            progress(done + 1, total)
+        pair = None  # результаты задачи не держим, пока подгружается следующая
+
+# SAVING TO CSV TABLE
+# SAVING TO CSV TABLE
+
+def save_to_csv(parsed_data, file_path, progress=None, columns=None):
+    """
+    Сохраняет данные в CSV построчно (память не растёт с числом результатов).
+    columns — готовый список колонок (по умолчанию row_columns: требует прохода по результатам).
+    progress(done, total) — по задачам (см. _rows_with_progress).
+    """
+    with open(file_path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=columns or row_columns(parsed_data))
+        writer.writeheader()
+        writer.writerows(_rows_with_progress(parsed_data, progress))
 
 # SAVING TO EXCEL TABLE
 # SAVING TO EXCEL TABLE
 
-def save_to_excel(parsed_data, file_path):
-    """Сохраняет данные в Excel"""
-    rows = []
-    for url, data in parsed_data.items():
-        for item in data:
-            if isinstance(item, str):
-                item = extract_link_and_text(item)  # 🔥 Конвертируем строку в словарь
-            rows.append({
-                "URL": url,
-                "Title": item.get("title"),
-                "Link": item.get("link"),
-                "Description": item.get("description")
-            })
+def save_to_excel(parsed_data, file_path, progress=None, columns=None):
+    """
+    Сохраняет данные в Excel потоково (write-only книга openpyxl: строки не держатся в памяти).
+    Больше EXCEL_MAX_ROWS строк — продолжение на листах "Results (2)", "Results (3)"…
+    columns — как в save_to_csv; progress(done, total) — по задачам (см. _rows_with_progress).
+    """
+    from openpyxl import Workbook
+
+    columns = columns or row_columns(parsed_data)
+
+    workbook = Workbook(write_only=True)
+    sheet = None
+    sheet_rows = EXCEL_MAX_ROWS  # сразу создаст первый лист
+
+    for row in _rows_with_progress(parsed_data, progress):
+        if sheet_rows >= EXCEL_MAX_ROWS:
+            title = "Results" if sheet is None else f"Results ({len(workbook.worksheets) + 1})"
+            sheet = workbook.create_sheet(title)
+            sheet.append(columns)
+            sheet_rows = 1
+        sheet.append([row.get(column) for column in columns])
+        sheet_rows += 1
+
+    if sheet is None:
+        workbook.create_sheet("Results").append(columns)
+
+    workbook.save(file_path)
+
+# COLUMNAR EXPORT (PARQUET / ARROW)
+# COLUMNAR EXPORT (PARQUET / ARROW)
+
+COLUMNAR_ROW_GROUP = 100000
+COLUMNAR_COLUMNS = ["url", "run_at", "status", "field", "tag", "title", "link", "description"]
+
+
+def iter_task_rows(tasks):
+    """
+    Строки колоночного экспорта по записям task_results: {url, status, last_run, results}.
+    run_at — время запуска задачи (datetime или None).
+    """
+    for task in tasks:
+        run_at = None
+        if task.get("last_run"):
+            try:
+                run_at = datetime.strptime(task["last_run"], "%Y-%m-%d %H:%M:%S")
+            except ValueError:
+                pass
+
+        for field, item in iter_results(task.get("results")):
+            fields = item_fields(item)
+            yield (
+                task.get("url", ""),
+                run_at,
+                task.get("status", ""),
+                field,
+                item.get("tag") if isinstance(item, dict) else None,
+                fields.get("title"),
+                fields.get("link"),
+                fields.get("description")
+            )
+
+
+def save_to_columnar(tasks, file_path, progress=None):
+    """
+    Сохраняет результаты задач в Parquet (.parquet) или Arrow IPC / Feather (.feather, .arrow).
+    Строки пишутся группами по COLUMNAR_ROW_GROUP — память не зависит от общего числа строк.
+    progress(done, total) — по задачам: после каждой задачи и каждой записанной группы.
+    Результаты каждой задачи читаются один раз (отдельного прохода для подсчёта строк нет).
+    """
+    import pyarrow as pa
+
+    schema = pa.schema([
+        ("url", pa.string()),
+        ("run_at", pa.timestamp("s")),
+        ("status", pa.string()),
+        ("field", pa.string()),
+        ("tag", pa.string()),
+        ("title", pa.string()),
+        ("link", pa.string()),
+        ("description", pa.string())
+    ])
+
+    tasks = list(tasks)
+    total = len(tasks)
+
+    if file_path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(file_path, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_file(file_path, schema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+
+    written = 0
+    columns = [[] for _ in COLUMNAR_COLUMNS]
+    try:
+        for done, task in enumerate(tasks):
+            for row in iter_task_rows([task]):
+                for column, value in zip(columns, row):
+                    column.append(value)
+                if len(columns[0]) >= COLUMNAR_ROW_GROUP:
+                    written += _write_row_group(writer, schema, columns)
+                    if progress:
+                        progress(done, total)
+            if progress:
+                progress(done + 1, total)
+
+        if columns[0] or not written:
+            written += _write_row_group(writer, schema, columns)
+    finally:
+        writer.close()
 
-    df = pd.DataFrame(rows)
-    df.to_excel(file_path, index=False, engine='openpyxl')
+
+def _write_row_group(writer, schema, columns):
+    import pyarrow as pa
+
+    batch = pa.record_batch([pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema)
+    writer.write_batch(batch)
+    for column in columns:
+        column.clear()
+    return batch.num_rows
+
+# JSON LINES
+# JSON LINES
+
+def save_to_jsonl(tasks, file_path, progress=None):
+    """Одна строка JSON на задачу: {url, status, last_run, results}; progress(done, total) — по задачам"""
+    tasks = list(tasks)
+    with open(file_path, "w", encoding="utf-8") as f:
+        for done, task in enumerate(tasks, 1):
+            f.write(json.dumps({
+                "url": task.get("url", ""),
+                "status": task.get("status", ""),
+                "last_run": task.get("last_run", ""),
+                "results": task.get("results") or []
+            }, ensure_ascii=False) + "\n")
+            if progress:
+                progress(done, len(tasks))
+
+# BULK EXPORT OF SEVERAL TASKS INTO ONE FILE
+# BULK EXPORT OF SEVERAL TASKS INTO ONE FILE
+
+EXPORT_FILTERS = (
+    "JSON Lines (*.jsonl);;CSV (*.csv);;Excel (*.xlsx);;"
+    "Parquet (*.parquet);;Arrow / Feather (*.feather)"
+)
+
+
+def export_tasks(tasks, file_path, progress=None):
+    """
+    Записывает результаты нескольких задач (записи task_results) в один файл.
+    Формат — по расширению: .jsonl, .csv, .xlsx, .parquet, .feather / .arrow.
+    Результаты каждой задачи (LazyTaskResult) подгружаются один раз, когда до неё дошла запись;
+    progress(done, total) — по задачам.
+    """
+    if file_path.endswith((".parquet", ".feather", ".arrow")):
+        save_to_columnar(tasks, file_path, progress)
+    elif file_path.endswith(".csv"):
+        save_to_csv(TaskResultPairs(tasks), file_path, progress, columns=ROW_COLUMNS)
+    elif file_path.endswith(".xlsx"):
+        save_to_excel(TaskResultPairs(tasks), file_path, progress, columns=ROW_COLUMNS)
+    else:
+        save_to_jsonl(tasks, file_path, progress)
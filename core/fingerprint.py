@@ -0,0 +1,43 @@
+# core/fingerprint.py
+
+import hashlib
+import json
+
+STATUS_UNCHANGED = "✅ Без изменений"
+
+# Отпечаток задачи: {"body": sha256 тела, "selector": ключ селектора, "results": sha256 результатов}
+# Хранится между запусками; совпадение тела (или результатов) — повод не трогать UI и не разбирать страницу.
+
+
+def page_fingerprint(body, selector, method, css_engine="lxml", digest=None, include_html=False):
+    """Отпечаток скачанной страницы (без результатов); digest — уже посчитанный sha256 тела"""
+    return {
+        "body": digest or hashlib.sha256(body).hexdigest(),
+        "selector": f"{method.lower()}|{css_engine}|{int(include_html)}|{selector}",
+        "results": None
+    }
+
+
+def results_hash(results):
+    data = json.dumps(results, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def same_page(previous, current):
+    """Тело страницы и селектор не изменились — разбирать страницу заново не нужно"""
+    return bool(
+        previous
+        and previous.get("results")
+        and previous["body"] == current["body"]
+        and previous["selector"] == current["selector"]
+    )
+
+
+def same_results(previous, current):
+    """Страница изменилась, но извлечённые результаты те же"""
+    return bool(
+        previous
+        and previous.get("results")
+        and previous["selector"] == current["selector"]
+        and previous["results"] == current["results"]
+    )
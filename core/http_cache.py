@@ -0,0 +1,170 @@
+# core/http_cache.py
+
+import hashlib
+import json
+import os
+import threading
+
+HTTP_CACHE_DIR = "http_cache"
+DEFAULT_MAX_MB = 200
+
+
+def request_key(url, headers=None, cookies=None, proxy=None):
+    """
+    Ключ записи кэша: URL и всё, от чего зависит ответ — заголовки запроса (в т.ч. User-Agent), куки и прокси.
+    Запрос с другими куками или UA не получит чужое тело по 304.
+    """
+    identity = [
+        url,
+        sorted((name.lower(), str(value)) for name, value in (headers or {}).items()),
+        sorted((name, str(value)) for name, value in (cookies or {}).items()),
+        proxy or ""
+    ]
+    return hashlib.sha1(json.dumps(identity, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class HttpCache:
+    """
+    Дисковый кэш ответов для условных GET-запросов (включается настройкой http_cache).
+    Для каждого запроса (request_key) хранит тело ответа и валидаторы ETag / Last-Modified;
+    при 304 Not Modified тело берётся из кэша. Общий размер ограничен,
+    при превышении удаляются давно не использованные записи (LRU по mtime).
+    Методы вызываются из многих потоков: чтение, запись и вытеснение идут под одной блокировкой.
+    """
+
+    def __init__(self, directory=HTTP_CACHE_DIR, max_mb=DEFAULT_MAX_MB):
+        self.directory = directory
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._total_bytes = None  # считается лениво при первой записи
+
+    def configure(self, max_mb=None):
+        if max_mb:
+            self.max_bytes = int(max_mb * 1024 * 1024)
+
+    def conditional_headers(self, key):
+        """Заголовки If-None-Match / If-Modified-Since для запроса (пустой dict, если записи нет)"""
+        with self._lock:
+            meta = self._read_meta(key)
+        if not meta:
+            return {}
+
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def load(self, key):
+        """Возвращает (body, encoding) из кэша или None"""
+        meta_path, body_path = self._paths(key)
+        with self._lock:
+            meta = self._read_meta(key)
+            if not meta or not os.path.exists(body_path):
+                return None
+
+            with open(body_path, "rb") as f:
+                body = f.read()
+
+            # Отмечаем использование для LRU
+            os.utime(meta_path, None)
+
+        return body, meta.get("encoding")
+
+    def store(self, key, url, headers, body, encoding):
+        """Сохраняет ответ, если у него есть ETag или Last-Modified (и он не помечен Vary: *)"""
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        # Остальные Vary покрыты ключом: в нём все заголовки запроса
+        if headers.get("Vary", "").strip() == "*":
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        meta_path, body_path = self._paths(key)
+
+        with self._lock:
+            old_size = self._entry_size(meta_path, body_path)
+
+            with open(body_path, "wb") as f:
+                f.write(body)
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "url": url,
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "encoding": encoding,
+                    "size": len(body)
+                }, f, ensure_ascii=False)
+
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            else:
+                self._total_bytes += self._entry_size(meta_path, body_path) - old_size
+
+            if self._total_bytes > self.max_bytes:
+                self._evict_locked()
+
+    def clear(self):
+        with self._lock:
+            if os.path.isdir(self.directory):
+                for name in os.listdir(self.directory):
+                    os.remove(os.path.join(self.directory, name))
+            self._total_bytes = 0
+
+    # ============================
+    # 🔹 Внутренние методы
+    # ============================
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + ".json", base + ".body"
+
+    def _read_meta(self, key):
+        meta_path, _ = self._paths(key)
+        if not os.path.exists(meta_path):
+            return None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _entry_size(meta_path, body_path):
+        size = 0
+        for path in (meta_path, body_path):
+            if os.path.exists(path):
+                size += os.path.getsize(path)
+        return size
+
+    def _scan_size(self):
+        total = 0
+        for name in os.listdir(self.directory):
+            total += os.path.getsize(os.path.join(self.directory, name))
+        return total
+
+    def _evict_locked(self):
+        # Самые давно использованные записи — первыми (mtime .json обновляется при load)
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                meta_path = os.path.join(self.directory, name)
+                entries.append((os.path.getmtime(meta_path), meta_path))
+        entries.sort()
+
+        target = int(self.max_bytes * 0.9)
+        for _, meta_path in entries:
+            if self._total_bytes <= target:
+                break
+            body_path = meta_path[:-len(".json")] + ".body"
+            self._total_bytes -= self._entry_size(meta_path, body_path)
+            for path in (meta_path, body_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+# Общий кэш на процесс
+cache = HttpCache()
@@ -0,0 +1,148 @@
+# core/http_client.py
+
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_POOL_SIZE = 10      # соединений на один хост
+DEFAULT_IDLE_TIMEOUT = 90   # секунд простоя до закрытия клиента
+
+
+class _RejectAllCookies(DefaultCookiePolicy):
+    """Общая сессия не копит куки — они передаются и возвращаются для каждой задачи отдельно."""
+
+    def set_ok(self, cookie, request):
+        return False
+
+
+class HttpClientRegistry:
+    """
+    Потокобезопасный реестр общих requests.Session с ключом (proxy, host).
+    Позволяет переиспользовать keep-alive соединения между запусками задач
+    и закрывает клиентов, которые простаивают дольше idle_timeout.
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self._clients = {}  # (proxy, host) -> [session, last_used]
+        self._lock = threading.Lock()
+        # Счётчики уже закрытых клиентов, чтобы статистика не обнулялась
+        self._closed_opened = 0
+        self._closed_requests = 0
+
+    def configure(self, pool_size=None, idle_timeout=None):
+        """Меняет размер пула и таймаут простоя (действует для новых клиентов)."""
+        with self._lock:
+            if pool_size:
+                self.pool_size = int(pool_size)
+            if idle_timeout:
+                self.idle_timeout = int(idle_timeout)
+
+    def get_session(self, url, proxy=None):
+        """Возвращает общую сессию для хоста URL (создаёт при необходимости)."""
+        key = (proxy or "", urlparse(url).netloc.lower())
+        now = time.monotonic()
+
+        with self._lock:
+            self._evict_idle_locked(now)
+
+            entry = self._clients.get(key)
+            if entry is None:
+                entry = [self._create_session(), now]
+                self._clients[key] = entry
+            else:
+                entry[1] = now
+            return entry[0]
+
+    def evict_idle(self):
+        """Закрывает клиентов, простаивающих дольше idle_timeout."""
+        with self._lock:
+            self._evict_idle_locked(time.monotonic())
+
+    def close_all(self):
+        """Закрывает все клиенты (например, при выходе из приложения)."""
+        with self._lock:
+            for key in list(self._clients):
+                self._close_locked(key)
+
+    def stats(self):
+        """
+        Возвращает статистику соединений:
+        {"clients": ..., "opened": ..., "reused": ..., "requests": ...}
+        """
+        with self._lock:
+            opened = self._closed_opened
+            requests_total = self._closed_requests
+            for session, _ in self._clients.values():
+                s_opened, s_requests = _session_counters(session)
+                opened += s_opened
+                requests_total += s_requests
+
+            return {
+                "clients": len(self._clients),
+                "opened": opened,
+                "reused": max(requests_total - opened, 0),
+                "requests": requests_total,
+            }
+
+    # ============================
+    # 🔹 Внутренние методы
+    # ============================
+
+    def _create_session(self):
+        session = requests.Session()
+        session.cookies.set_policy(_RejectAllCookies())
+
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _evict_idle_locked(self, now):
+        for key, (_, last_used) in list(self._clients.items()):
+            if now - last_used > self.idle_timeout:
+                self._close_locked(key)
+
+    def _close_locked(self, key):
+        session, _ = self._clients.pop(key)
+        s_opened, s_requests = _session_counters(session)
+        self._closed_opened += s_opened
+        self._closed_requests += s_requests
+        session.close()
+
+
+def _session_counters(session):
+    """Суммирует num_connections / num_requests по всем пулам urllib3 в сессии."""
+    opened = 0
+    requests_total = 0
+
+    for adapter in set(session.adapters.values()):
+        managers = [adapter.poolmanager] + list(adapter.proxy_manager.values())
+        for manager in managers:
+            if manager is None:
+                continue
+            for pool_key in manager.pools.keys():
+                pool = manager.pools.get(pool_key)
+                if pool is None:
+                    continue
+                opened += pool.num_connections
+                requests_total += pool.num_requests
+
+    return opened, requests_total
+
+
+# Общий реестр на процесс
+registry = HttpClientRegistry()
+
+
+def get_session(url, proxy=None):
+    return registry.get_session(url, proxy)
+
+
+def get_stats():
+    return registry.stats()
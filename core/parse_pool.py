@@ -0,0 +1,55 @@
+# core/parse_pool.py
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from core.scraper import extract_from_bytes
+
+_executor = None
+_lock = threading.Lock()
+
+
+def _init_worker():
+    """Инициализатор процесса: заранее импортируем bs4/lxml, чтобы первый разбор не платил за импорт"""
+    import bs4  # noqa: F401
+    import lxml.html  # noqa: F401
+    import cssselect  # noqa: F401
+    import core.scraper  # noqa: F401
+
+
+def _ping():
+    return os.getpid()
+
+
+def get_executor(max_workers=None):
+    """Общий ProcessPoolExecutor для разбора HTML (создаётся один раз на приложение)"""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=max_workers or os.cpu_count() or 1,
+                initializer=_init_worker
+            )
+        return _executor
+
+
+def warm_up(max_workers=None):
+    """Поднимает все процессы пула заранее (не блокирует вызывающий поток)"""
+    executor = get_executor(max_workers)
+    for _ in range(executor._max_workers):
+        executor.submit(_ping)
+
+
+def extract(body, encoding, url, selector, use_xpath=False, css_engine="lxml", include_html=False):
+    """Разбирает тело ответа в отдельном процессе и возвращает список результатов"""
+    future = get_executor().submit(extract_from_bytes, body, encoding, url, selector, use_xpath, css_engine, include_html)
+    return future.result()
+
+
+def shutdown():
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
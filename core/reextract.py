@@ -0,0 +1,126 @@
+# core/reextract.py
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, CancelledError, as_completed
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from core.scraper import normalize_url, extract_from_bytes
+from core.results import count_results
+from core import fingerprint
+from core import snapshot_store
+
+STATUS_SUCCESS = "✅ Успешно"
+STATUS_ERROR = "❌ Ошибка"
+STATUS_STOPPED = "⏸️ Остановлено"
+
+
+def extract_snapshot(url, selector, use_xpath=False, css_engine="lxml", include_html=False):
+    """
+    Применяет селектор к последнему снимку страницы.
+    Тело читается там же, где разбирается (в т.ч. в процессе parse_pool) — в другой процесс передаётся только URL.
+    """
+    snapshot = snapshot_store.store.load(url)
+    if snapshot is None:
+        raise RuntimeError("Нет сохранённого снимка страницы")
+    body, encoding, _ = snapshot
+    return extract_from_bytes(body, encoding, url, selector, use_xpath, css_engine, include_html)
+
+
+class ReextractWorker(QThread):
+    """
+    Повторный разбор снимков страниц для пачки задач без обращения к сети.
+    Разбор идёт параллельно: в переданном пуле процессов (parse_pool) или в своём пуле потоков.
+    Результаты отдаются пачками, в формате AsyncScrapeEngine.batch_finished.
+    """
+
+    # [(task_id, status, message, results, None), ...] — куки задачи не меняются
+    batch_finished = pyqtSignal(list)
+
+    def __init__(self, tasks, css_engine="lxml", fingerprints=None, executor=None, max_workers=None, batch_interval=0.1, include_html=False):
+        super().__init__()
+        self.tasks = tasks  # [(task_id, url, selector, method), ...]
+        self.css_engine = css_engine
+        self.include_html = include_html
+        self.fingerprints = fingerprints if fingerprints is not None else {}
+        self.executor = executor
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.batch_interval = batch_interval
+        self._futures = {}  # task_id -> Future
+
+    def cancel(self, task_id):
+        """Снимает задачу, если её разбор ещё не начался; True — задача этого воркера"""
+        future = self._futures.get(task_id)
+        if future is None:
+            return False
+        future.cancel()
+        return True
+
+    def cancel_all(self):
+        for future in list(self._futures.values()):
+            future.cancel()
+
+    def run(self):
+        own_pool = self.executor is None
+        executor = ThreadPoolExecutor(max_workers=self.max_workers) if own_pool else self.executor
+
+        batch = []
+        last_emit = time.monotonic()
+        pending = {}  # Future -> (task_id, отпечаток без результатов)
+
+        try:
+            for task_id, url, selector, method in self.tasks:
+                url = normalize_url(url)
+                digest = snapshot_store.store.digest(url)
+                if digest is None:
+                    self.fingerprints.pop(task_id, None)
+                    batch.append((task_id, STATUS_ERROR, "Нет сохранённого снимка страницы", [], None))
+                    continue
+
+                # Снимок и селектор те же, что при прошлом разборе — результаты уже есть
+                previous = self.fingerprints.get(task_id)
+                current = fingerprint.page_fingerprint(None, selector, method, self.css_engine, digest=digest, include_html=self.include_html)
+                if fingerprint.same_page(previous, current):
+                    batch.append((task_id, fingerprint.STATUS_UNCHANGED, "Снимок не изменился", None, None))
+                    continue
+
+                future = executor.submit(extract_snapshot, url, selector, method.lower() == "xpath", self.css_engine, self.include_html)
+                self._futures[task_id] = future
+                pending[future] = (task_id, current)
+
+            for future in as_completed(pending):
+                task_id, current = pending[future]
+                batch.append(self._finished(task_id, current, future))
+
+                if time.monotonic() - last_emit >= self.batch_interval:
+                    self.batch_finished.emit(batch)
+                    batch = []
+                    last_emit = time.monotonic()
+        finally:
+            if own_pool:
+                executor.shutdown(wait=False, cancel_futures=True)
+            if batch:
+                self.batch_finished.emit(batch)
+
+    def _finished(self, task_id, current, future):
+        try:
+            results = future.result()
+        except CancelledError:
+            # Результаты задачи станут пустыми — прошлый отпечаток им больше не соответствует
+            self.fingerprints.pop(task_id, None)
+            return task_id, STATUS_STOPPED, "Задача отменена", [], None
+        except Exception as e:
+            self.fingerprints.pop(task_id, None)
+            return task_id, STATUS_ERROR, str(e) or e.__class__.__name__, [], None
+
+        previous = self.fingerprints.get(task_id)
+        current["results"] = fingerprint.results_hash(results)
+        unchanged = fingerprint.same_results(previous, current)
+        self.fingerprints[task_id] = current
+        if unchanged:
+            return task_id, fingerprint.STATUS_UNCHANGED, "Результаты не изменились", None, None
+
+        found = count_results(results)
+        message = f"Найдено элементов: {found}" if found else "Элементов не найдено"
+        return task_id, STATUS_SUCCESS, message, results, None
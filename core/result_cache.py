@@ -0,0 +1,98 @@
+# core/result_cache.py
+
+import threading
+from collections import OrderedDict
+
+from core.results import iter_results
+
+DEFAULT_MAX_MB = 256
+
+
+class ResultCache:
+    """
+    LRU результатов задач, подгружаемых с диска по ссылке (файл JSON / строка SQLite).
+    Размер считается приблизительно — по длине строк результатов.
+    """
+
+    def __init__(self, max_mb=DEFAULT_MAX_MB):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.loads = 0
+        self._items = OrderedDict()  # ref -> (results, size)
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def configure(self, max_mb=None):
+        if max_mb:
+            self.max_bytes = int(max_mb * 1024 * 1024)
+
+    def get(self, ref, loader):
+        with self._lock:
+            cached = self._items.get(ref)
+            if cached is not None:
+                self._items.move_to_end(ref)
+                return cached[0]
+
+        results = loader(ref[1])
+        size = estimate_size(results)
+
+        with self._lock:
+            self.loads += 1
+            old = self._items.pop(ref, None)
+            if old:
+                self._total -= old[1]
+            self._items[ref] = (results, size)
+            self._total += size
+            # Последний загруженный остаётся, даже если сам больше лимита
+            while self._total > self.max_bytes and len(self._items) > 1:
+                _, (_, evicted_size) = self._items.popitem(last=False)
+                self._total -= evicted_size
+
+        return results
+
+    def discard(self, ref):
+        with self._lock:
+            old = self._items.pop(ref, None)
+            if old:
+                self._total -= old[1]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._total = 0
+
+    def stats(self):
+        with self._lock:
+            return {"items": len(self._items), "mb": round(self._total / 1024 / 1024, 1), "loads": self.loads}
+
+
+def estimate_size(results):
+    return sum(len(item) if isinstance(item, str) else len(str(item)) for _, item in iter_results(results))
+
+
+# Общий кэш на процесс
+cache = ResultCache()
+
+
+class LazyTaskResult(dict):
+    """
+    Запись task_results восстановленной сессии: метаданные (url, status, last_run…)
+    лежат в словаре, а список results подгружается через ResultCache при обращении.
+    """
+
+    def __init__(self, ref, loader, **fields):
+        super().__init__(**fields)
+        self.ref = ref          # (backend, results_path | id строки tasks)
+        self.loader = loader    # loader(ref[1]) -> results
+
+    def __getitem__(self, key):
+        if key == "results" and not dict.__contains__(self, "results"):
+            return cache.get(self.ref, self.loader)
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        if key == "results" and not dict.__contains__(self, "results"):
+            return self["results"]
+        return super().get(key, default)
+
+    def __contains__(self, key):
+        return key == "results" or super().__contains__(key)
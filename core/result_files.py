@@ -0,0 +1,96 @@
+# core/result_files.py
+
+import gzip
+import json
+import lzma
+
+from core.storage import load_settings, DEFAULT_SETTINGS
+
+# Формат файлов результатов задачи в JSON-сессиях (results/<сессия>/task_*.*)
+#   .json           — список/словарь целиком (прежний формат, только чтение и "json" в настройках)
+#   .ndjson[.gz|.xz] — по записи на строку; одинаковые значения пишутся один раз,
+#                      повторы ссылаются на первую запись: {"r": номер}
+# Дедупликация — только внутри одного файла. Между запусками задачи она не нужна и не делается:
+# JSON-сессия хранит лишь последний запуск (файл задачи перезаписывается, а не дополняется),
+# а неизменившиеся результаты вообще не переписываются (отпечатки страниц + TaskStore.take_dirty).
+# Одинаковые значения в файлах разных задач или разных сессий хранятся каждый раз заново.
+# SQLite-сессии хранят историю запусков, поэтому там значения общие на всю базу (core.session_db, payloads).
+FORMAT_EXTENSIONS = {"json": ".json", "ndjson": ".ndjson"}
+COMPRESSION_EXTENSIONS = {"none": "", "gzip": ".gz", "lzma": ".xz"}
+
+
+def result_extension(settings=None):
+    """Расширение файла результатов по настройкам results_format / results_compression"""
+    settings = settings or load_settings()
+    fmt = settings.get("results_format", DEFAULT_SETTINGS["results_format"])
+    if fmt != "ndjson":
+        return FORMAT_EXTENSIONS["json"]
+    compression = settings.get("results_compression", DEFAULT_SETTINGS["results_compression"])
+    return FORMAT_EXTENSIONS["ndjson"] + COMPRESSION_EXTENSIONS.get(compression, "")
+
+
+def write_results(path, results):
+    """
+    Записывает результаты задачи; формат и сжатие — по расширению path.
+    Повторы ищутся только среди значений этого вызова (прежний файл задачи не читается).
+    """
+    if path.endswith(".json"):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4, ensure_ascii=False)
+        return
+
+    is_dict = isinstance(results, dict)
+    header = {"kind": "dict", "fields": list(results)} if is_dict else {"kind": "list"}
+    lines = [json.dumps(header, ensure_ascii=False)]
+
+    seen = {}  # значение (строка или сериализованный объект) -> номер записи
+    fields = results.items() if is_dict else ((None, results or []),)
+    for field, values in fields:
+        prefix = '{"f": %s, ' % json.dumps(field, ensure_ascii=False) if is_dict else "{"
+        for value in values:
+            key = value if isinstance(value, str) else json.dumps(value, sort_keys=True)
+            number = seen.get(key)
+            if number is None:
+                seen[key] = len(lines) - 1
+                lines.append(f'{prefix}"v": {json.dumps(value, ensure_ascii=False)}}}')
+            else:
+                lines.append(f'{prefix}"r": {number}}}')
+
+    # Одна запись в поток: построчная запись в gzip/lzma заметно медленнее
+    with _open(path, "wt") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def read_results(path):
+    """Читает результаты, записанные write_results (или старым json.dump)"""
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    with _open(path, "rt") as f:
+        header, _, body = f.read().partition("\n")
+
+    header = json.loads(header or "{}")
+    is_dict = header.get("kind") == "dict"
+    results = {field: [] for field in header.get("fields", [])} if is_dict else []
+
+    # Записи разбираются одним вызовом json.loads, а не построчно
+    records = json.loads("[" + ",".join(line for line in body.splitlines() if line) + "]")
+    values = []
+    for record in records:
+        value = record["v"] if "v" in record else values[record["r"]]
+        values.append(value)
+        if is_dict:
+            results.setdefault(record["f"], []).append(value)
+        else:
+            results.append(value)
+
+    return results
+
+
+def _open(path, mode):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, encoding="utf-8", compresslevel=6)
+    if path.endswith(".xz"):
+        return lzma.open(path, mode, encoding="utf-8")
+    return open(path, mode[0], encoding="utf-8")
@@ -0,0 +1,22 @@
+# core/results.py
+
+# Результат задачи — либо список (один селектор),
+# либо словарь {поле: список} (несколько именованных селекторов).
+
+
+def count_results(results):
+    """Общее количество найденных элементов"""
+    if isinstance(results, dict):
+        return sum(len(values) for values in results.values())
+    return len(results or [])
+
+
+def iter_results(results):
+    """Перебирает результаты как пары (field, item); для списка field = None"""
+    if isinstance(results, dict):
+        for field, values in results.items():
+            for item in values:
+                yield field, item
+    else:
+        for item in results or []:
+            yield None, item
@@ -1,7 +1,11 @@
-import requests
+import re
 from bs4 import BeautifulSoup
-from lxml import html
+from cssselect import SelectorError
+from lxml import etree, html
 from urllib.parse import urljoin
+from core import http_client
+from core import http_cache
+from core import selector_cache
 
 def scrape_website(
     url,
@@ -11,59 +15,258 @@ def scrape_website(
     headers=None,
     user_agent=None,
     timeout=10,
-    cookies=None
+    cookies=None,
+    parse_in_process=False,
+    css_engine="lxml",
+    use_cache=False,
+    include_html=False
 ):
-    """Парсит сайт с поддержкой прокси, заголовков, куки и таймаута"""
+    """
+    Парсит сайт с поддержкой прокси, заголовков, куки и таймаута.
+    parse_in_process=True — разбор HTML выполняется в пуле процессов (core.parse_pool).
+    css_engine — "lxml" (CSS → XPath на дереве lxml) или "bs4" (BeautifulSoup.select).
+    use_cache=True — условный GET через дисковый кэш (core.http_cache).
+    include_html=True — в записи результатов добавляется внешний HTML элемента.
+    """
 
-    # Добавляем https://, если нет
+    page = fetch_page(url, proxy, headers, user_agent, timeout, cookies, use_cache)
+
+    # Результаты
+    results = extract_page(page, selector, use_xpath, parse_in_process, css_engine, include_html)
+
+    # ✅ Возвращаем также куки
+    return results, page.cookies
+
+
+class FetchResult:
+    """Скачанная страница: тело в байтах, кодировка и куки задачи после запроса"""
+
+    __slots__ = ("url", "body", "encoding", "cookies", "from_cache")
+
+    def __init__(self, url, body, encoding, cookies, from_cache=False):
+        self.url = url
+        self.body = body
+        self.encoding = encoding
+        self.cookies = cookies
+        self.from_cache = from_cache
+
+
+def fetch_page(url, proxy=None, headers=None, user_agent=None, timeout=10, cookies=None, use_cache=False):
+    """Выполняет GET-запрос через общий пул соединений (и кэш, если включён)"""
+    url = normalize_url(url)
+    headers = prepare_headers(headers, user_agent)
+
+    # Прокси
+    proxies = {"http": proxy, "https": proxy} if proxy else None
+
+    # Общая сессия из пула (keep-alive), куки передаём только в этот запрос
+    session = http_client.get_session(url, proxy)
+
+    # Валидаторы из кэша: сервер ответит 304, если страница не менялась
+    request_headers = dict(headers)
+    if use_cache:
+        cache_key = http_cache.request_key(url, headers, cookies, proxy)
+        request_headers.update(http_cache.cache.conditional_headers(cache_key))
+
+    # Выполняем запрос
+    response = session.get(url, headers=request_headers, proxies=proxies, timeout=timeout, cookies=cookies)
+
+    if use_cache and response.status_code == 304:
+        cached = http_cache.cache.load(cache_key)
+        if cached:
+            body, encoding = cached
+            return FetchResult(url, body, encoding, collect_cookies(cookies, response), from_cache=True)
+
+        # Запись пропала между запросами — повторяем без валидаторов
+        response = session.get(url, headers=headers, proxies=proxies, timeout=timeout, cookies=cookies)
+
+    response.raise_for_status()
+
+    encoding = response.encoding or response.apparent_encoding
+    if use_cache:
+        http_cache.cache.store(cache_key, url, response.headers, response.content, encoding)
+
+    return FetchResult(url, response.content, encoding, collect_cookies(cookies, response))
+
+
+def extract_page(page, selector, use_xpath=False, parse_in_process=False, css_engine="lxml", include_html=False):
+    """Применяет селектор к скачанной странице (в текущем потоке или в пуле процессов)"""
+    if parse_in_process:
+        from core import parse_pool
+        return parse_pool.extract(page.body, page.encoding, page.url, selector, use_xpath, css_engine, include_html)
+    return extract_from_bytes(page.body, page.encoding, page.url, selector, use_xpath, css_engine, include_html)
+
+
+def normalize_url(url):
+    """Добавляет https://, если схема не указана"""
     if not url.startswith(("http://", "https://")):
         url = "https://" + url
+    return url
 
-    # Подготовка заголовков
-    headers = headers or {}
+
+def prepare_headers(headers=None, user_agent=None):
+    """Копия заголовков задачи с выставленным User-Agent"""
+    headers = dict(headers or {})
     if user_agent:
         headers["User-Agent"] = user_agent
     elif "User-Agent" not in headers:
         headers["User-Agent"] = "Mozilla/5.0"
+    return headers
 
-    # Прокси
-    proxies = {"http": proxy, "https": proxy} if proxy else None
 
-    # Куки и сессия
-    session = requests.Session()
+def extract_results(page_html, url, selector, use_xpath=False, css_engine="lxml", include_html=False):
+    """
+    Применяет CSS/XPath селектор к HTML страницы.
+    Один селектор — возвращает список записей (см. make_record).
+    Несколько именованных селекторов (по одному на строку, "name = selector") —
+    документ разбирается один раз, возвращается словарь {name: [записи]}.
+    """
+    page = ParsedPage(page_html)
+    fields = parse_selectors(selector)
 
-    if cookies:
-        session.cookies.update(cookies)
+    if len(fields) == 1 and fields[0][0] is None:
+        return _select(page, fields[0][1], url, use_xpath, css_engine, include_html)
 
-    # Выполняем запрос
-    response = session.get(url, headers=headers, proxies=proxies, timeout=timeout)
-    response.raise_for_status()
+    return {
+        name or field_selector: _select(page, field_selector, url, use_xpath, css_engine, include_html)
+        for name, field_selector in fields
+    }
 
-    # Результаты
-    results = []
 
+# Строка вида "title = h1 > a"; имя — идентификатор, чтобы не путать с a[href=...] или @id='x'
+FIELD_PATTERN = re.compile(r"^\s*([A-Za-z_][\w-]*)\s*=\s*(.+)$")
+
+# lxml не принимает str с объявлением кодировки (<?xml ... encoding=...?>) — у XHTML-страниц его убираем
+XML_DECLARATION = re.compile(r"^\s*<\?xml[^>]*\?>")
+
+
+def parse_selectors(selector_text):
+    """
+    Разбирает текст из колонки Selectors в список (name, selector).
+    Каждая непустая строка — отдельный селектор; name = None, если имя не задано.
+    Запятая внутри строки остаётся группой CSS-селекторов (h1, h2).
+    """
+    fields = []
+    for line in selector_text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        match = FIELD_PATTERN.match(line)
+        if match:
+            fields.append((match.group(1), match.group(2).strip()))
+        else:
+            fields.append((None, line))
+
+    return fields or [(None, selector_text.strip())]
+
+
+class ParsedPage:
+    """HTML страницы, разобранный лениво и не более одного раза для каждого парсера"""
+
+    def __init__(self, page_html):
+        self.page_html = page_html
+        self._tree = None
+        self._soup = None
+
+    @property
+    def tree(self):
+        if self._tree is None:
+            self._tree = html.fromstring(XML_DECLARATION.sub("", self.page_html, count=1))
+        return self._tree
+
+    @property
+    def soup(self):
+        if self._soup is None:
+            self._soup = BeautifulSoup(self.page_html, "html.parser")
+        return self._soup
+
+
+def _select(page, selector, url, use_xpath=False, css_engine="lxml", include_html=False):
     if use_xpath:
-        tree = html.fromstring(response.text)
-        elements = tree.xpath(selector)
-
-        for el in elements:
-            if el.tag == "a" and "href" in el.attrib:
-                full_link = urljoin(url, el.attrib["href"])
-                text = el.text_content().strip() or full_link
-                results.append(f'<a href="{full_link}" target="_blank">{text}</a>')
-            else:
-                results.append(html.tostring(el, encoding="unicode"))
-    else:
-        soup = BeautifulSoup(response.text, "html.parser")
-        elements = soup.select(selector)
-
-        for element in elements:
-            if element.name == "a" and element.get("href"):
-                full_link = urljoin(url, element["href"])
-                text = element.get_text(strip=True) or full_link
-                results.append(f'<a href="{full_link}" target="_blank">{text}</a>')
-            else:
-                results.append(str(element.prettify()))
+        return _collect_lxml(selector_cache.get_compiled(selector, use_xpath=True)(page.tree), url, include_html)
 
-    # ✅ Возвращаем также куки
-    return results, session.cookies.get_dict()
+    if css_engine == "lxml":
+        try:
+            compiled = selector_cache.get_compiled(selector)
+            return _collect_lxml(compiled(page.tree), url, include_html)
+        except (SelectorError, etree.ParserError, ValueError):
+            # Селектор, который cssselect не понимает (или документ, который lxml не разобрал) — идём через bs4
+            pass
+
+    return _collect_bs4(page.soup.select(selector), url, include_html)
+
+
+def make_record(tag, text, href=None, attrs=None, outer_html=None):
+    """
+    Запись результата: {"tag", "text"[, "href"][, "attrs"][, "html"]}.
+    Пустые поля не пишутся — записи компактнее HTML-строк и не требуют повторного разбора при экспорте.
+    """
+    record = {"tag": tag, "text": text}
+    if href:
+        record["href"] = href
+    if attrs:
+        record["attrs"] = attrs
+    if outer_html is not None:
+        record["html"] = outer_html
+    return record
+
+
+def _collect_lxml(elements, url, include_html=False):
+    results = []
+
+    for el in elements:
+        if not hasattr(el, "tag"):
+            # XPath вида //a/@href или //h1/text() возвращает строки
+            results.append(make_record(None, str(el)))
+            continue
+        if not isinstance(el.tag, str):
+            # Комментарии и инструкции обработки
+            continue
+
+        attrs = dict(el.attrib)
+        href = attrs.pop("href", None)
+        if href is not None:
+            href = urljoin(url, href)
+        text = " ".join(el.text_content().split())
+        if el.tag == "a" and href:
+            text = text or href
+
+        outer_html = html.tostring(el, encoding="unicode", with_tail=False) if include_html else None
+        results.append(make_record(el.tag, text, href, attrs, outer_html))
+
+    return results
+
+
+def _collect_bs4(elements, url, include_html=False):
+    results = []
+
+    for element in elements:
+        attrs = {
+            name: " ".join(value) if isinstance(value, list) else value
+            for name, value in element.attrs.items()
+        }
+        href = attrs.pop("href", None)
+        if href is not None:
+            href = urljoin(url, href)
+        text = " ".join(element.get_text(" ").split())
+        if element.name == "a" and href:
+            text = text or href
+
+        outer_html = str(element) if include_html else None
+        results.append(make_record(element.name, text, href, attrs, outer_html))
+
+    return results
+
+
+def extract_from_bytes(body, encoding, url, selector, use_xpath=False, css_engine="lxml", include_html=False):
+    """То же, что extract_results, но из байтов ответа (для передачи в другой процесс)"""
+    page_html = body.decode(encoding or "utf-8", errors="replace")
+    return extract_results(page_html, url, selector, use_xpath, css_engine, include_html)
+
+
+def collect_cookies(sent_cookies, response):
+    """Куки задачи после запроса: отправленные + выставленные ответом (включая редиректы)."""
+    final_cookies = dict(sent_cookies or {})
+    for r in response.history + [response]:
+        final_cookies.update(r.cookies.get_dict())
+    return final_cookies
@@ -0,0 +1,95 @@
+# core/selector_cache.py
+
+import threading
+from collections import OrderedDict
+
+from cssselect import HTMLTranslator
+from lxml import etree
+
+DEFAULT_MAX_SIZE = 512
+
+
+class SelectorCache:
+    """
+    LRU-кэш скомпилированных селекторов (lxml.etree.XPath) с ключом (method, selector).
+    CSS-селекторы переводятся в XPath один раз, дальше используется готовый объект.
+
+    Кэш свой у каждого процесса. При разборе в пуле процессов (process_pool_parsing, core.parse_pool)
+    селекторы компилируются и кэшируются в процессах пула: счётчики и invalidate() этого процесса
+    их не касаются, поэтому статистика в этом режиме не показывается. На результат это не влияет —
+    скомпилированный селектор однозначно определяется ключом, а размер кэша в пуле ограничен тем же LRU.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, method, selector):
+        """
+        Возвращает скомпилированный селектор.
+        method — "css" или "xpath". Ошибки перевода/компиляции не кэшируются.
+        """
+        key = (method, selector)
+
+        with self._lock:
+            compiled = self._items.get(key)
+            if compiled is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+
+        expression = css_to_xpath(selector) if method == "css" else selector
+        compiled = etree.XPath(expression)
+
+        with self._lock:
+            self._items[key] = compiled
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+        return compiled
+
+    def invalidate(self, selector=None, method=None):
+        """Удаляет записи для селектора (и метода); без аргументов — очищает кэш"""
+        with self._lock:
+            if selector is None and method is None:
+                self._items.clear()
+                return
+            for key in list(self._items):
+                key_method, key_selector = key
+                if selector is not None and key_selector != selector:
+                    continue
+                if method is not None and key_method != method:
+                    continue
+                del self._items[key]
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._items)}
+
+
+def css_to_xpath(selector):
+    """Переводит CSS-селектор в XPath (как lxml.cssselect)"""
+    return HTMLTranslator().css_to_xpath(selector)
+
+
+# Общий кэш на процесс
+cache = SelectorCache()
+
+
+def get_compiled(selector, use_xpath=False):
+    return cache.get("xpath" if use_xpath else "css", selector)
+
+
+def invalidate(selector=None, method=None):
+    if method is not None:
+        method = method.lower()
+    cache.invalidate(selector, method)
+
+
+def get_stats():
+    return cache.stats()
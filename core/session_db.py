@@ -0,0 +1,427 @@
+# core/session_db.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from core import result_cache
+from core.results import iter_results
+
+SESSION_DB_FILE = "sessions.db"
+SQLITE_PREFIX = "sqlite:"
+PAYLOAD_BATCH = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    datetime TEXT NOT NULL,
+    task_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    selector TEXT NOT NULL,
+    method TEXT NOT NULL,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL DEFAULT '{}',
+    cookies_file TEXT NOT NULL DEFAULT '',
+    log_path TEXT NOT NULL DEFAULT '',
+    timer_interval INTEGER NOT NULL DEFAULT 0,
+    last_run TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    task_id INTEGER NOT NULL REFERENCES tasks(id) ON DELETE CASCADE,
+    run_at TEXT NOT NULL,
+    status TEXT NOT NULL,
+    message TEXT NOT NULL DEFAULT '',
+    item_count INTEGER NOT NULL DEFAULT 0,
+    is_dict INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS payloads (
+    id INTEGER PRIMARY KEY,
+    hash BLOB NOT NULL UNIQUE,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS run_items (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    field TEXT,
+    payload_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_datetime ON sessions(datetime);
+CREATE INDEX IF NOT EXISTS idx_tasks_session ON tasks(session_id, position);
+CREATE INDEX IF NOT EXISTS idx_tasks_url ON tasks(url);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
+CREATE INDEX IF NOT EXISTS idx_runs_task ON runs(task_id, run_at);
+CREATE INDEX IF NOT EXISTS idx_runs_run_at ON runs(run_at);
+CREATE INDEX IF NOT EXISTS idx_runs_status ON runs(status);
+CREATE INDEX IF NOT EXISTS idx_run_items_run ON run_items(run_id);
+"""
+
+
+class SessionDB:
+    """
+    SQLite-хранилище сессий: sessions → tasks → runs → run_items.
+    Значение элемента хранится один раз на базу (payloads, уникальный sha1 JSON-строки),
+    запуски ссылаются на него по id: повторные запуски неизменившейся страницы добавляют только ссылки.
+    Режим WAL: чтение (список сессий, история) не блокируется записью.
+    Одно соединение на процесс, доступ под блокировкой (GUI + фоновое сохранение).
+    """
+
+    def __init__(self, path=SESSION_DB_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self.is_new = not os.path.exists(path)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+        self._migrate_items()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ============================
+    # 🔹 Сессии
+    # ============================
+
+    def save_session(self, session_name, tasks, saved_at=None):
+        """
+        Сохраняет сессию одной транзакцией.
+        tasks — словари как в session_service.save_session. Задачи с "saved_ref"
+        (id строки tasks с прошлого сохранения) обновляются на месте: поля — если
+        "changed", новый запуск с результатами — только если есть ключ "results".
+        Задачи сессии, которых нет в tasks, удаляются. В словари записывается "saved_ref".
+        :return: путь вида "sqlite:<имя>"
+        """
+        saved_at = saved_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT id FROM sessions WHERE name = ?", (session_name,)).fetchone()
+            if row:
+                session_id = row["id"]
+                self._conn.execute(
+                    "UPDATE sessions SET datetime = ?, task_count = ? WHERE id = ?",
+                    (saved_at, len(tasks), session_id)
+                )
+            else:
+                session_id = self._conn.execute(
+                    "INSERT INTO sessions (name, datetime, task_count) VALUES (?, ?, ?)",
+                    (session_name, saved_at, len(tasks))
+                ).lastrowid
+
+            existing = {
+                row[0] for row in self._conn.execute("SELECT id FROM tasks WHERE session_id = ?", (session_id,))
+            }
+            kept = set()
+
+            for position, task in enumerate(tasks):
+                db_id = task.get("saved_ref")
+                if db_id in existing:
+                    self._update_task(db_id, position, task)
+                    if "results" in task:
+                        self._insert_run(db_id, task)
+                        result_cache.cache.discard(("sqlite", db_id))
+                else:
+                    db_id = self._insert_task(session_id, position, task)
+                    if task.get("results"):
+                        self._insert_run(db_id, task)
+                task["saved_ref"] = db_id
+                kept.add(db_id)
+
+            stale = existing - kept
+            if stale:
+                self._conn.executemany("DELETE FROM tasks WHERE id = ?", [(db_id,) for db_id in stale])
+                self._drop_orphan_payloads()
+
+        return SQLITE_PREFIX + session_name
+
+    def list_sessions(self):
+        """Имя, дата и число задач — из таблицы sessions, без чтения задач"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, datetime, task_count FROM sessions ORDER BY datetime DESC, name DESC"
+            ).fetchall()
+
+        return [{
+            "file": row["name"],
+            "path": SQLITE_PREFIX + row["name"],
+            "session_name": row["name"],
+            "datetime": row["datetime"],
+            "task_count": row["task_count"]
+        } for row in rows]
+
+    def load_session(self, session_name):
+        """
+        Возвращает сессию в том же формате, что и JSON-файл, но без результатов:
+        вместо них "db_id" — результаты последнего запуска читает load_results()
+        """
+        with self._lock:
+            session = self._conn.execute(
+                "SELECT id, name, datetime FROM sessions WHERE name = ?", (session_name,)
+            ).fetchone()
+            if session is None:
+                raise FileNotFoundError(f"Сессия не найдена: {session_name}")
+
+            task_rows = self._conn.execute(
+                "SELECT * FROM tasks WHERE session_id = ? ORDER BY position", (session["id"],)
+            ).fetchall()
+
+            tasks = []
+            for row in task_rows:
+                tasks.append({
+                    "db_id": row["id"],
+                    "url": row["url"],
+                    "selector": row["selector"],
+                    "method": row["method"],
+                    "status": row["status"],
+                    "params": json.loads(row["params"]),
+                    "cookies_file": row["cookies_file"],
+                    "log_path": row["log_path"],
+                    "timer_interval": row["timer_interval"],
+                    "last_run": row["last_run"]
+                })
+
+        return {
+            "session_name": session["name"],
+            "datetime": session["datetime"],
+            "tasks": tasks
+        }
+
+    def load_results(self, db_id):
+        """Результаты последнего запуска задачи (id строки tasks)"""
+        with self._lock:
+            return self._load_last_results(db_id)
+
+    def delete_session(self, session_name):
+        with self._lock, self._conn:
+            deleted = self._conn.execute("DELETE FROM sessions WHERE name = ?", (session_name,)).rowcount
+            if deleted:
+                self._drop_orphan_payloads()
+        return deleted > 0
+
+    # ============================
+    # 🔹 История
+    # ============================
+
+    def query_runs(self, url=None, status=None, since=None, until=None, limit=1000):
+        """
+        История запусков по индексам: URL (точное совпадение), статус, диапазон дат.
+        :return: список словарей (session, url, run_at, status, message, item_count)
+        """
+        conditions, args = [], []
+        if url:
+            conditions.append("t.url = ?")
+            args.append(url)
+        if status:
+            conditions.append("r.status = ?")
+            args.append(status)
+        if since:
+            conditions.append("r.run_at >= ?")
+            args.append(since)
+        if until:
+            conditions.append("r.run_at < ?")
+            args.append(until)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = f"""
+            SELECT s.name AS session, t.url, r.run_at, r.status, r.message, r.item_count
+            FROM runs r
+            JOIN tasks t ON t.id = r.task_id
+            JOIN sessions s ON s.id = t.session_id
+            {where}
+            ORDER BY r.run_at DESC
+            LIMIT ?
+        """
+        with self._lock:
+            rows = self._conn.execute(sql, (*args, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    # ============================
+    # 🔹 Импорт JSON-сессий
+    # ============================
+
+    def import_json_sessions(self, sessions_dir, load_results):
+        """
+        Переносит JSON-сессии в базу (уже импортированные по имени пропускаются).
+        load_results(path) — загрузчик results_path (session_service.load_task_results).
+        :return: число импортированных сессий
+        """
+        if not os.path.isdir(sessions_dir):
+            return 0
+
+        with self._lock:
+            existing = {row[0] for row in self._conn.execute("SELECT name FROM sessions")}
+
+        imported = 0
+        for file in sorted(os.listdir(sessions_dir)):
+            if not file.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(sessions_dir, file), "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            name = data.get("session_name") or file[:-len(".json")]
+            if name in existing:
+                continue
+
+            tasks = []
+            for task in data.get("tasks", []):
+                task = dict(task)
+                if "results" not in task:
+                    task["results"] = load_results(task.get("results_path"))
+                tasks.append(task)
+
+            self.save_session(name, tasks, saved_at=data.get("datetime") or None)
+            existing.add(name)
+            imported += 1
+
+        return imported
+
+    # ============================
+    # 🔹 Внутренние методы
+    # ============================
+
+    def _insert_task(self, session_id, position, task):
+        return self._conn.execute(
+            """INSERT INTO tasks (session_id, position, url, selector, method, status, params,
+                                  cookies_file, log_path, timer_interval, last_run)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (session_id, position, *self._task_fields(task))
+        ).lastrowid
+
+    def _update_task(self, db_id, position, task):
+        if task.get("changed", True):
+            self._conn.execute(
+                """UPDATE tasks SET position = ?, url = ?, selector = ?, method = ?, status = ?, params = ?,
+                                    cookies_file = ?, log_path = ?, timer_interval = ?, last_run = ?
+                   WHERE id = ?""",
+                (position, *self._task_fields(task), db_id)
+            )
+        else:
+            # Неизменённая задача могла только сдвинуться (удаление строк выше)
+            self._conn.execute(
+                "UPDATE tasks SET position = ? WHERE id = ? AND position != ?", (position, db_id, position)
+            )
+
+    @staticmethod
+    def _task_fields(task):
+        return (
+            task.get("url", ""), task.get("selector", ""), task.get("method", "CSS"),
+            task.get("status", "Ожидает"),
+            json.dumps(task.get("params", {}), ensure_ascii=False),
+            task.get("cookies_file", "") or "", task.get("log_path", "") or "",
+            task.get("timer_interval", 0) or 0, task.get("last_run", "") or ""
+        )
+
+    def _insert_run(self, db_id, task):
+        results = task.get("results") or []
+        items = []
+        payloads = {}  # hash -> value; уже известные базе значения INSERT OR IGNORE пропустит
+        for field, item in iter_results(results):
+            value = json.dumps(item, ensure_ascii=False)
+            digest = _payload_hash(value)
+            payloads[digest] = value
+            items.append((field, digest))
+
+        self._conn.executemany("INSERT OR IGNORE INTO payloads (hash, value) VALUES (?, ?)", payloads.items())
+        payload_ids = self._payload_ids(list(payloads))
+
+        run_id = self._conn.execute(
+            "INSERT INTO runs (task_id, run_at, status, message, item_count, is_dict) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                db_id, task.get("last_run", "") or "", task.get("status", ""),
+                task.get("message", "") or "", len(items), int(isinstance(results, dict))
+            )
+        ).lastrowid
+        self._conn.executemany(
+            "INSERT INTO run_items (run_id, field, payload_id) VALUES (?, ?, ?)",
+            [(run_id, field, payload_ids[digest]) for field, digest in items]
+        )
+
+    def _payload_ids(self, digests):
+        """hash -> id строки payloads; запросы пачками (лимит параметров SQLite)"""
+        ids = {}
+        for start in range(0, len(digests), PAYLOAD_BATCH):
+            chunk = digests[start:start + PAYLOAD_BATCH]
+            placeholders = ", ".join("?" * len(chunk))
+            ids.update(self._conn.execute(f"SELECT hash, id FROM payloads WHERE hash IN ({placeholders})", chunk))
+        return ids
+
+    def _load_last_results(self, task_id):
+        run = self._conn.execute(
+            "SELECT id, is_dict FROM runs WHERE task_id = ? ORDER BY run_at DESC, id DESC LIMIT 1", (task_id,)
+        ).fetchone()
+        if run is None:
+            return []
+
+        items = self._conn.execute(
+            """SELECT i.field, p.value FROM run_items i JOIN payloads p ON p.id = i.payload_id
+               WHERE i.run_id = ? ORDER BY i.id""",
+            (run["id"],)
+        ).fetchall()
+
+        if not run["is_dict"]:
+            return [json.loads(row["value"]) for row in items]
+
+        results = {}
+        for row in items:
+            results.setdefault(row["field"], []).append(json.loads(row["value"]))
+        return results
+
+    def _drop_orphan_payloads(self):
+        # Значения, на которые больше не ссылается ни один запуск (удалены задачи или сессии)
+        self._conn.execute("DELETE FROM payloads WHERE id NOT IN (SELECT payload_id FROM run_items)")
+
+    def _migrate_items(self):
+        """Базы прежней схемы: значения из items (по копии на запуск) переносятся в payloads + run_items"""
+        if not self._conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'items'").fetchone():
+            return
+
+        self._conn.create_function("payload_hash", 1, _payload_hash, deterministic=True)
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO payloads (hash, value) SELECT payload_hash(value), value FROM items"
+            )
+            self._conn.execute(
+                """INSERT INTO run_items (id, run_id, field, payload_id)
+                   SELECT i.id, i.run_id, i.field, p.id FROM items i JOIN payloads p ON p.hash = payload_hash(i.value)"""
+            )
+            self._conn.execute("DROP TABLE items")
+
+
+def _payload_hash(value):
+    return hashlib.sha1(value.encode("utf-8")).digest()
+
+
+# Общая база на процесс (открывается при первом обращении)
+_db = None
+_db_lock = threading.Lock()
+
+
+def get_db():
+    global _db
+    with _db_lock:
+        if _db is None:
+            _db = SessionDB()
+        return _db
+
+
+def is_db_path(path):
+    return isinstance(path, str) and path.startswith(SQLITE_PREFIX)
+
+
+def name_from_path(path):
+    return path[len(SQLITE_PREFIX):]
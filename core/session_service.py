@@ -2,11 +2,23 @@
 
 import os
 import json
+import uuid
+import threading
 from datetime import datetime
 
+from PyQt5.QtCore import QThread
+
+from core.storage import load_settings, DEFAULT_SETTINGS
+from core import session_db
+from core import result_cache
+from core import result_files
+from core.result_cache import LazyTaskResult
+
 # Определяем директории для хранения сессий и результатов
 SESSIONS_DIR = "sessions"
 RESULTS_DIR = "results"
+# Индекс JSON-сессий: имя, дата, число задач, mtime/size файла — списки не читают все сессии
+SESSION_INDEX = os.path.join(SESSIONS_DIR, ".index")
 
 os.makedirs(SESSIONS_DIR, exist_ok=True)
 os.makedirs(RESULTS_DIR, exist_ok=True)
@@ -18,13 +30,31 @@ def generate_session_name():
     now = datetime.now().strftime("%Y-%m-%d_%H-%M")
     return f"session_{now}"
 
+def use_sqlite():
+    """Хранилище сессий из настроек: "json" (файлы) или "sqlite" (sessions.db)"""
+    return load_settings().get("session_backend", DEFAULT_SETTINGS["session_backend"]) == "sqlite"
+
+def get_session_db():
+    """База сессий; при первом создании в неё переносятся существующие JSON-сессии"""
+    db = session_db.get_db()
+    if db.is_new:
+        db.is_new = False
+        db.import_json_sessions(SESSIONS_DIR, load_task_results)
+    return db
+
 def save_session(session_name, tasks):
     """
     Сохраняет текущую сессию.
     :param session_name: имя сессии
-    :param tasks: список словарей с параметрами задач
-    :return: путь к файлу сохранённой сессии
+    :param tasks: список словарей с параметрами задач.
+        Если у задачи есть "saved_ref" (файл результатов / строка в базе с прошлого сохранения)
+        и нет ключа "results" — её результаты не изменились и не перезаписываются.
+        После сохранения в каждый словарь записывается актуальный "saved_ref".
+    :return: путь к файлу сохранённой сессии ("sqlite:<имя>" для SQLite)
     """
+    if use_sqlite():
+        return get_session_db().save_session(session_name, tasks)
+
     session_data = {
         "session_name": session_name,
         "datetime": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
@@ -33,13 +63,21 @@ def save_session(session_name, tasks):
 
     result_dir = os.path.join(RESULTS_DIR, session_name)
     os.makedirs(result_dir, exist_ok=True)
-
-    for i, task in enumerate(tasks):
-        result_path = None
-        if task.get("results"):
-            result_path = os.path.join(result_dir, f"task_{i}.json")
-            with open(result_path, "w", encoding="utf-8") as f:
-                json.dump(task["results"], f, indent=4, ensure_ascii=False)
+    extension = result_files.result_extension()
+
+    for task in tasks:
+        result_path = task.get("saved_ref")
+        if "results" in task:
+            if task["results"]:
+                # Новое имя файла не пересекается с файлами прошлых сохранений;
+                # при смене формата в настройках старый файл удалится ниже как лишний
+                if not result_path or not result_path.endswith(extension):
+                    result_path = os.path.join(result_dir, f"task_{uuid.uuid4().hex[:12]}{extension}")
+                result_files.write_results(result_path, task["results"])
+                result_cache.cache.discard(("json", result_path))
+            else:
+                result_path = None
+        task["saved_ref"] = result_path
 
         session_data["tasks"].append({
             "url": task.get("url", ""),
@@ -54,44 +92,142 @@ def save_session(session_name, tasks):
             "last_run": task.get("last_run", "")
         })
 
+    # Файлы результатов удалённых задач больше не нужны
+    referenced = {os.path.normpath(task["saved_ref"]) for task in tasks if task["saved_ref"]}
+    for file in os.listdir(result_dir):
+        file_path = os.path.join(result_dir, file)
+        if os.path.normpath(file_path) not in referenced:
+            os.remove(file_path)
+
     path = os.path.join(SESSIONS_DIR, f"{session_name}.json")
     with open(path, "w", encoding="utf-8") as f:
         json.dump(session_data, f, indent=4, ensure_ascii=False)
 
+    _update_index(os.path.basename(path), session_data)
     return path
 
 def load_session(path):
-    """Загружает сессию по заданному пути к JSON-файлу."""
+    """Загружает сессию по заданному пути к JSON-файлу (или "sqlite:<имя>")."""
+    if session_db.is_db_path(path):
+        return get_session_db().load_session(session_db.name_from_path(path))
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
+def load_task_results(results_path):
+    """Результаты задачи из JSON-сессии (results_path), [] если файла нет"""
+    if not results_path or not os.path.exists(results_path):
+        return []
+    return result_files.read_results(results_path)
+
+def load_db_results(db_id):
+    """Результаты задачи из SQLite-сессии (id строки tasks)"""
+    return get_session_db().load_results(db_id)
+
 def list_sessions():
     """
     Возвращает список всех сессий с информацией (имя файла, дата, количество задач).
     :return: список словарей с данными сессий
     """
-    sessions = []
-    for file in sorted(os.listdir(SESSIONS_DIR), reverse=True):
-        if file.endswith(".json"):
-            path = os.path.join(SESSIONS_DIR, file)
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                sessions.append({
-                    "file": file,
-                    "path": path,
-                    "session_name": data.get("session_name", file),
-                    "datetime": data.get("datetime", ""),
-                    "task_count": len(data.get("tasks", []))
-                })
+    if use_sqlite():
+        return get_session_db().list_sessions()
+
+    with _index_lock:
+        index = _read_index()
+        changed = False
+        sessions = []
+        files = set()
+
+        for entry in sorted(os.scandir(SESSIONS_DIR), key=lambda e: e.name, reverse=True):
+            if not entry.name.endswith(".json") or not entry.is_file():
+                continue
+            files.add(entry.name)
+            stat = entry.stat()
+            info = index.get(entry.name)
+            # Файл изменён не через save_session (или индекса ещё нет) — перечитываем только его
+            if not info or info["mtime"] != stat.st_mtime or info["size"] != stat.st_size:
+                try:
+                    with open(entry.path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                info = index[entry.name] = _index_entry(entry.name, data, stat)
+                changed = True
+
+            sessions.append({
+                "file": entry.name,
+                "path": os.path.join(SESSIONS_DIR, entry.name),
+                "session_name": info["session_name"],
+                "datetime": info["datetime"],
+                "task_count": info["task_count"]
+            })
+
+        # Файлы, удалённые вручную
+        for file in index.keys() - files:
+            del index[file]
+            changed = True
+
+        if changed:
+            _write_index(index)
     return sessions
 
 def delete_session(path):
     """Удаляет файл сессии по заданному пути."""
+    if session_db.is_db_path(path):
+        return get_session_db().delete_session(session_db.name_from_path(path))
     if os.path.exists(path):
         os.remove(path)
+        with _index_lock:
+            index = _read_index()
+            if index.pop(os.path.basename(path), None) is not None:
+                _write_index(index)
         return True
     return False
 
+# ========= Индекс JSON-сессий =========
+
+_index_lock = threading.Lock()      # сохранение идёт и из потока автосохранения
+_index_memo = {"key": None, "index": {}}
+
+def _index_entry(file, data, stat):
+    return {
+        "session_name": data.get("session_name", file),
+        "datetime": data.get("datetime", ""),
+        "task_count": len(data.get("tasks", [])),
+        "mtime": stat.st_mtime,
+        "size": stat.st_size
+    }
+
+def _read_index():
+    """Индекс {файл: запись}; повторно не разбирается, пока сам файл индекса не изменился"""
+    try:
+        stat = os.stat(SESSION_INDEX)
+    except OSError:
+        return {}
+    key = (stat.st_mtime_ns, stat.st_size)
+    if _index_memo["key"] != key:
+        try:
+            with open(SESSION_INDEX, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        _index_memo.update(key=key, index=index)
+    return dict(_index_memo["index"])
+
+def _write_index(index):
+    tmp_path = SESSION_INDEX + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    os.replace(tmp_path, SESSION_INDEX)
+    stat = os.stat(SESSION_INDEX)
+    _index_memo.update(key=(stat.st_mtime_ns, stat.st_size), index=dict(index))
+
+def _update_index(file, session_data):
+    """Запись только что сохранённой сессии — без повторного чтения её файла"""
+    with _index_lock:
+        index = _read_index()
+        index[file] = _index_entry(file, session_data, os.stat(os.path.join(SESSIONS_DIR, file)))
+        _write_index(index)
+
 def get_cookie_file_name(url):
     """
     Возвращает имя файла cookies для указанного URL.
@@ -102,91 +238,214 @@ def get_cookie_file_name(url):
 
 # ========= Класс для работы с сессиями в UI (был в session_controller.py) =========
 
+class SessionSaveWorker(QThread):
+    """
+    Сохраняет снимок сессии в фоне (автосохранение), не блокируя GUI.
+    Итог (path или error) остаётся в воркере: SessionController применяет его ровно один раз —
+    по сигналу finished или сразу после wait(), если сохранение нужно дождаться.
+    """
+
+    def __init__(self, session_name, tasks, dirty):
+        super().__init__()
+        self.session_name = session_name
+        self.tasks = tasks
+        self.dirty = dirty      # (dirty, dirty_results) — вернуть в TaskStore при ошибке
+        self.path = None
+        self.error = None
+        self.applied = False
+
+    def run(self):
+        try:
+            self.path = save_session(self.session_name, self.tasks)
+        except Exception as e:
+            self.error = str(e) or e.__class__.__name__
+
+
 class SessionController:
     """
     Класс, отвечающий за интеграцию сохранения/восстановления сессии с UI.
     Использует функции сохранения сессии, определённые выше.
+    Повторное сохранение под тем же именем записывает только изменённые задачи
+    (TaskStore.take_dirty); остальные ссылаются на результаты прошлого сохранения.
     """
 
-    def __init__(self, table_controller, add_task_callback, task_params, task_results, task_intervals):
+    def __init__(self, table_controller, task_params, task_results, task_intervals):
         self.table = table_controller
-        self.add_task = add_task_callback
         self.task_params = task_params
         self.task_results = task_results
         self.task_intervals = task_intervals
+        self.saved_name = None      # имя последней сохранённой/загруженной сессии
+        self.saved_refs = {}        # task_id -> results_path (JSON) или id строки tasks (SQLite)
+        self.save_worker = None     # SessionSaveWorker автосохранения
 
-    def save_session(self, session_name):
+        # Лимит памяти под подгруженные с диска результаты (LazyTaskResult)
+        result_cache.cache.configure(load_settings().get("results_cache_mb", DEFAULT_SETTINGS["results_cache_mb"]))
+
+    def collect_tasks(self, session_name):
         """
-        Сохраняет сессию, собирая данные по всем задачам из таблицы.
-        :param session_name: имя сессии
-        :return: путь к сохранённому файлу сессии
+        Снимок задач для сохранения (на GUI-потоке, без копирования результатов).
+        :return: (tasks, (dirty, dirty_results))
         """
+        store = self.table.model.store
+        dirty, dirty_results = store.take_dirty()
+        incremental = session_name == self.saved_name
         tasks = []
 
-        for row in range(self.table.table.rowCount()):
-            task = self.table.get_task_data(row)
-            params = self.task_params.get(row, {})
-            results = self.task_results.get(row, [])
-            timer_interval = self.task_intervals.get(row, 0)
-            cookies_file = get_cookie_file_name(task["url"])
+        for record in store:
+            task = self.table.get_record_data(record)
+            entry = self.task_results.get(record.task_id) or {}
 
-            tasks.append({
+            saved = {
+                "task_id": record.task_id,
                 "url": task["url"],
                 "selector": task["selector"],
                 "method": task["method"],
                 "status": task["status"],
-                "params": params,
-                "cookies_file": cookies_file,
-                "results": results,
-                "timer_interval": timer_interval,
+                "params": self.task_params.get(record.task_id, {}),
+                "cookies_file": get_cookie_file_name(task["url"]),
+                "message": entry.get("message", ""),
+                "timer_interval": self.task_intervals.get(record.task_id, 0),
                 "last_run": task["last_run"],
-            })
+                "changed": not incremental or record.task_id in dirty,
+            }
+
+            ref = self.saved_refs.get(record.task_id) if incremental else None
+            if ref is not None:
+                saved["saved_ref"] = ref
+            if ref is None or record.task_id in dirty_results:
+                saved["results"] = entry.get("results", [])
 
-        return save_session(session_name, tasks)
+            tasks.append(saved)
+
+        return tasks, (dirty, dirty_results)
+
+    def save_session(self, session_name):
+        """
+        Сохраняет сессию, собирая данные по всем задачам из таблицы.
+        :param session_name: имя сессии
+        :return: путь к сохранённому файлу сессии
+        """
+        # Не пишем одновременно с автосохранением; его итог применяется до сбора задач,
+        # иначе запоздавший сигнал воркера перезапишет saved_refs этого сохранения устаревшими
+        self.wait_autosave()
+
+        tasks, dirty = self.collect_tasks(session_name)
+        try:
+            path = save_session(session_name, tasks)
+        except Exception:
+            self.table.model.store.mark_dirty_many(*dirty)
+            raise
+
+        self._remember(session_name, tasks)
+        return path
+
+    def autosave(self, session_name):
+        """
+        Фоновое сохранение, если с прошлого сохранения что-то изменилось.
+        :return: True, если сохранение запущено
+        """
+        if self.save_worker and self.save_worker.isRunning():
+            return False
+        # Прошлое автосохранение завершилось, но сигнал ещё в очереди — применяем сейчас
+        self.wait_autosave()
+
+        tasks, dirty = self.collect_tasks(session_name)
+        if not dirty[0] and session_name == self.saved_name:
+            return False
+
+        worker = SessionSaveWorker(session_name, tasks, dirty)
+        worker.finished.connect(lambda w=worker: self._apply_autosave(w))
+        self.save_worker = worker
+        worker.start()
+        return True
+
+    def wait_autosave(self):
+        """Дожидается автосохранения и сразу применяет его итог (сигнал finished потом ничего не сделает)"""
+        if self.save_worker:
+            self.save_worker.wait()
+            self._apply_autosave(self.save_worker)
+
+    def _apply_autosave(self, worker):
+        if worker.applied:
+            return
+        worker.applied = True
+
+        if worker.error is not None:
+            print(f"[session] Автосохранение не удалось: {worker.error}")
+            self.table.model.store.mark_dirty_many(*worker.dirty)
+        else:
+            self._remember(worker.session_name, worker.tasks)
+
+    def _remember(self, session_name, tasks):
+        self.saved_name = session_name
+        self.saved_refs = {
+            task["task_id"]: task["saved_ref"] for task in tasks if task.get("saved_ref") is not None
+        }
 
     def restore_session(self, session_data):
         """
         Восстанавливает сессию из данных, загруженных из JSON.
         Заполняет таблицу и соответствующие словари параметров, результатов и интервалов.
+        Строки добавляются в модель одной пачкой — без перерисовки на каждую задачу.
+        Результаты не читаются: LazyTaskResult подгрузит их при экспорте/аналитике.
         :param session_data: данные сессии (словарь)
         """
-        from PyQt5.QtWidgets import QTableWidgetItem
-
+        self.wait_autosave()
         self.clear_all_tasks()
 
-        for i, task in enumerate(session_data.get("tasks", [])):
-            self.add_task(task["url"], task["selector"], task["method"], task["status"])
+        tasks = session_data.get("tasks", [])
 
-            self.task_params[i] = task.get("params", {})
-            self.task_results[i] = {
+        # Интервал таймера, файл cookies и "Last Run" — сразу в запись задачи
+        items = []
+        for task in tasks:
+            interval = task.get("timer_interval", 0)
+            items.append({
                 "url": task["url"],
+                "selector": task["selector"],
+                "method": task["method"],
                 "status": task["status"],
-                "results": task.get("results", []),
-                "message": task.get("log_path", ""),
+                "cookies_file": task.get("cookies_file", ""),
+                "timer_label": f"{interval} сек" if interval else "–",
                 "last_run": task.get("last_run", "")
-            }
-            self.task_intervals[i] = task.get("timer_interval", 0)
-
-            # Обновляем отображение "Last Run"
-            self.table.set_last_run(i, task.get("last_run", ""))
-
-            # Устанавливаем tooltip для cookies
-            self.table.table.setItem(i, 7, QTableWidgetItem(task.get("cookies_file", "")))
-
-            # Устанавливаем иконку для параметров
-            self.table.table.setItem(i, 8, QTableWidgetItem("🛠 Настроить"))
+            })
 
-            # Записываем интервал таймера
-            timer_text = f"{self.task_intervals[i]} сек" if self.task_intervals[i] else "–"
-            self.table.table.setItem(i, 9, QTableWidgetItem(timer_text))
+        task_ids = self.table.model.add_tasks(items)
 
-        self.table.table.resizeColumnsToContents()
+        saved_refs = {}
+        for task_id, task in zip(task_ids, tasks):
+            self.task_params[task_id] = task.get("params", {})
+            fields = {
+                "url": task["url"],
+                "status": task["status"],
+                "message": task.get("message") or task.get("log_path", ""),
+                "last_run": task.get("last_run", "")
+            }
+            if "results" in task:
+                self.task_results[task_id] = dict(fields, results=task["results"])
+            elif task.get("db_id") is not None:
+                self.task_results[task_id] = LazyTaskResult(("sqlite", task["db_id"]), load_db_results, **fields)
+            elif task.get("results_path"):
+                # В JSON-сессии результаты лежат отдельным файлом (results_path)
+                self.task_results[task_id] = LazyTaskResult(("json", task["results_path"]), load_task_results, **fields)
+            else:
+                self.task_results[task_id] = dict(fields, results=[])
+            self.task_intervals[task_id] = task.get("timer_interval", 0)
+
+            ref = task.get("db_id") or task.get("results_path")
+            if ref is not None:
+                saved_refs[task_id] = ref
+
+        # Только что загруженная сессия совпадает с сохранённой — изменений нет
+        self.table.model.store.take_dirty()
+        self.saved_name = session_data.get("session_name")
+        self.saved_refs = saved_refs
 
     def clear_all_tasks(self):
         """
         Очищает таблицу и внутренние словари, связанные с задачами.
         """
-        self.table.table.setRowCount(0)
+        self.table.model.clear()
+        result_cache.cache.clear()
         self.task_params.clear()
         self.task_results.clear()
         self.task_intervals.clear()
@@ -0,0 +1,165 @@
+# core/snapshot_store.py
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+SNAPSHOT_DIR = "snapshots"
+DEFAULT_MAX_MB = 500
+DEFAULT_MAX_AGE_DAYS = 14
+
+
+class SnapshotStore:
+    """
+    Снимки скачанных страниц для повторного разбора без сети.
+    Тела хранятся по sha256 содержимого (одинаковые страницы — один файл, gzip),
+    для каждого URL — ссылка на последний снимок. Общий размер и возраст ограничены:
+    лишнее удаляется начиная с давно не использованных тел (LRU по mtime).
+    """
+
+    def __init__(self, directory=SNAPSHOT_DIR, max_mb=DEFAULT_MAX_MB, max_age_days=DEFAULT_MAX_AGE_DAYS):
+        self.directory = directory
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.max_age = max_age_days * 86400
+        self._lock = threading.Lock()
+        self._total_bytes = None  # считается лениво при первой записи
+
+    def configure(self, max_mb=None, max_age_days=None):
+        if max_mb:
+            self.max_bytes = int(max_mb * 1024 * 1024)
+        if max_age_days:
+            self.max_age = max_age_days * 86400
+
+    def save(self, url, body, encoding, digest=None):
+        """Сохраняет тело ответа как последний снимок URL (digest — готовый sha256 тела, если есть)"""
+        digest = digest or hashlib.sha256(body).hexdigest()
+        body_path = self._body_path(digest)
+        ref_path = self._ref_path(url)
+
+        with self._lock:
+            os.makedirs(os.path.dirname(body_path), exist_ok=True)
+            os.makedirs(os.path.dirname(ref_path), exist_ok=True)
+
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+                self._evict_locked()
+
+            if os.path.exists(body_path):
+                # Та же страница уже есть — только отмечаем использование
+                os.utime(body_path, None)
+            else:
+                tmp_path = body_path + ".tmp"
+                with gzip.open(tmp_path, "wb", compresslevel=6) as f:
+                    f.write(body)
+                os.replace(tmp_path, body_path)
+                self._total_bytes += os.path.getsize(body_path)
+
+            with open(ref_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "url": url,
+                    "hash": digest,
+                    "encoding": encoding,
+                    "size": len(body),
+                    "captured_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                }, f, ensure_ascii=False)
+
+            if self._total_bytes > self.max_bytes:
+                self._evict_locked()
+
+    def load(self, url):
+        """Возвращает (body, encoding, captured_at) последнего снимка URL или None"""
+        meta = self._read_ref(url)
+        if not meta:
+            return None
+
+        body_path = self._body_path(meta["hash"])
+        try:
+            with gzip.open(body_path, "rb") as f:
+                body = f.read()
+            os.utime(body_path, None)
+        except OSError:
+            # Тело удалено при вытеснении
+            return None
+
+        return body, meta.get("encoding"), meta.get("captured_at", "")
+
+    def digest(self, url):
+        """sha256 тела последнего снимка URL или None (снимка нет или он вытеснен)"""
+        meta = self._read_ref(url)
+        if not meta or not os.path.exists(self._body_path(meta["hash"])):
+            return None
+        return meta["hash"]
+
+    def has(self, url):
+        return self.digest(url) is not None
+
+    def clear(self):
+        with self._lock:
+            for sub in ("bodies", "refs"):
+                path = os.path.join(self.directory, sub)
+                if os.path.isdir(path):
+                    for name in os.listdir(path):
+                        os.remove(os.path.join(path, name))
+            self._total_bytes = 0
+
+    # ============================
+    # 🔹 Внутренние методы
+    # ============================
+
+    def _body_path(self, digest):
+        return os.path.join(self.directory, "bodies", digest + ".gz")
+
+    def _ref_path(self, url):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, "refs", key + ".json")
+
+    def _read_ref(self, url):
+        ref_path = self._ref_path(url)
+        if not os.path.exists(ref_path):
+            return None
+        try:
+            with open(ref_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _bodies(self):
+        bodies_dir = os.path.join(self.directory, "bodies")
+        if not os.path.isdir(bodies_dir):
+            return []
+        return [entry for entry in os.scandir(bodies_dir) if entry.name.endswith(".gz")]
+
+    def _scan_size(self):
+        return sum(entry.stat().st_size for entry in self._bodies())
+
+    def _evict_locked(self):
+        # Старше max_age — удаляются всегда; дальше самые давно использованные, пока не уложимся в 90% лимита
+        entries = sorted((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in self._bodies())
+        expire_before = time.time() - self.max_age
+        target = int(self.max_bytes * 0.9)
+
+        for mtime, size, path in entries:
+            if mtime >= expire_before and self._total_bytes <= target:
+                break
+            os.remove(path)
+            self._total_bytes -= size
+
+        # Ссылки на удалённые тела больше не нужны
+        refs_dir = os.path.join(self.directory, "refs")
+        if os.path.isdir(refs_dir):
+            for entry in os.scandir(refs_dir):
+                try:
+                    with open(entry.path, "r", encoding="utf-8") as f:
+                        digest = json.load(f).get("hash", "")
+                except (OSError, ValueError):
+                    digest = ""
+                if not os.path.exists(self._body_path(digest)):
+                    os.remove(entry.path)
+
+
+# Общее хранилище на процесс
+store = SnapshotStore()
@@ -7,8 +7,29 @@ from datetime import datetime
 DEFAULT_SETTINGS = {
     "dark_theme": False,
     "auto_save": False,
+    "auto_save_interval": 60,
     "proxy_rotation": False,
-    "last_used_proxy": ""
+    "last_used_proxy": "",
+    "http_pool_size": 10,
+    "http_idle_timeout": 90,
+    "max_workers": 8,
+    "scrape_engine": "threads",
+    "async_max_concurrency": 100,
+    "async_per_host_limit": 6,
+    "process_pool_parsing": False,
+    "parse_processes": 0,
+    "css_engine": "lxml",
+    "results_include_html": False,
+    "http_cache": False,
+    "http_cache_max_mb": 200,
+    "page_snapshots": False,
+    "snapshot_max_mb": 500,
+    "snapshot_max_age_days": 14,
+    "ui_flush_interval_ms": 100,
+    "session_backend": "json",
+    "results_cache_mb": 256,
+    "results_format": "ndjson",
+    "results_compression": "gzip"
 }
 
 SETTINGS_FILE = "user_settings.json"
@@ -1,66 +1,303 @@
-from PyQt5.QtCore import QObject
+from collections import deque
+from PyQt5.QtCore import QObject, QTimer
 from core.task_worker import TaskWorker
 from core import cookie_manager
-from ui.table_utils import colorize_row_by_status
+from core.fingerprint import STATUS_UNCHANGED
+from core.storage import load_settings, DEFAULT_SETTINGS
+from ui.task_model import COL_STATUS, COL_LAST_RUN
 from datetime import datetime
 
+STATUS_QUEUED = "🕓 В очереди"
+
 class TaskManager(QObject):
-    def __init__(self, table, task_results, task_params, update_lcd_callback, update_tooltips_callback, lock_row_callback):
+    def __init__(self, model, task_results, task_params, update_lcd_callback, update_tooltips_callback, lock_task_callback, batch_applied_callback=None):
         super().__init__()
-        self.table = table
+        self.model = model          # ui.task_model.TaskTableModel (задачи по task_id)
         self.task_results = task_results
         self.task_params = task_params
         self.update_lcd = update_lcd_callback
         self.update_tooltips = update_tooltips_callback
-        self.lock_row = lock_row_callback
-        self.workers = []
+        self.lock_task = lock_task_callback
+        self.batch_applied = batch_applied_callback  # после каждой применённой пачки (например, ширина колонок)
+        self.workers = []           # активные TaskWorker (не больше max_workers)
+        self.pending = deque()      # task_id, ждущие свободного воркера
+        self.active_ids = set()     # task_id в очереди или в работе
+        self.fingerprints = {}      # task_id -> отпечаток последнего запуска (core.fingerprint)
+        self.offline_ids = set()    # task_id, которые разбирают снимок страницы, а не сайт
+        self.reextract_workers = [] # активные ReextractWorker (пакетный разбор снимков)
+
+        # ⚙️ Движок запуска: "threads" (пул TaskWorker) или "async" (один asyncio-цикл)
+        settings = load_settings()
+        self.max_workers = max(1, int(settings.get("max_workers", DEFAULT_SETTINGS["max_workers"])))
+
+        # 🖼 Завершённые задачи копятся в буфере и применяются к UI пачкой
+        self.finished_buffer = []
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(int(settings.get("ui_flush_interval_ms", DEFAULT_SETTINGS["ui_flush_interval_ms"])))
+        self.flush_timer.timeout.connect(self.flush_finished)
+
+        # 🧮 Разбор HTML в пуле процессов (обходит GIL на тяжёлых страницах)
+        self.parse_in_process = settings.get("process_pool_parsing", DEFAULT_SETTINGS["process_pool_parsing"])
+        if self.parse_in_process:
+            from core import parse_pool
+            parse_pool.get_executor(settings.get("parse_processes", DEFAULT_SETTINGS["parse_processes"]) or None)
+            parse_pool.warm_up()
+
+        # 🎯 Движок CSS-селекторов: "lxml" (быстрый) или "bs4" (совместимость)
+        self.css_engine = settings.get("css_engine", DEFAULT_SETTINGS["css_engine"])
+
+        # 🧾 Результаты — записи {tag, text, href, attrs}; внешний HTML элемента — по настройке
+        self.include_html = settings.get("results_include_html", DEFAULT_SETTINGS["results_include_html"])
+
+        # 🗄 Условные GET-запросы и дисковый кэш ответов
+        self.use_cache = settings.get("http_cache", DEFAULT_SETTINGS["http_cache"])
+        if self.use_cache:
+            from core import http_cache
+            http_cache.cache.configure(settings.get("http_cache_max_mb", DEFAULT_SETTINGS["http_cache_max_mb"]))
 
-    def run_task(self, row):
-        # Получаем данные из таблицы
-        url_item = self.table.item(row, 1)
-        selector_item = self.table.item(row, 2)
-        method_item = self.table.item(row, 3)
+        # 📦 Снимки тел страниц для повторного разбора без сети
+        self.use_snapshots = settings.get("page_snapshots", DEFAULT_SETTINGS["page_snapshots"])
+        if self.use_snapshots:
+            from core import snapshot_store
+            snapshot_store.store.configure(
+                settings.get("snapshot_max_mb", DEFAULT_SETTINGS["snapshot_max_mb"]),
+                settings.get("snapshot_max_age_days", DEFAULT_SETTINGS["snapshot_max_age_days"])
+            )
 
-        if not url_item or not selector_item or not method_item:
+        self.engine = None
+        if settings.get("scrape_engine", DEFAULT_SETTINGS["scrape_engine"]) == "async":
+            from core.async_engine import AsyncScrapeEngine
+            self.engine = AsyncScrapeEngine(
+                max_concurrency=settings.get("async_max_concurrency", DEFAULT_SETTINGS["async_max_concurrency"]),
+                per_host_limit=settings.get("async_per_host_limit", DEFAULT_SETTINGS["async_per_host_limit"]),
+                parse_in_process=self.parse_in_process,
+                css_engine=self.css_engine,
+                use_cache=self.use_cache,
+                fingerprints=self.fingerprints,
+                snapshots=self.use_snapshots,
+                include_html=self.include_html,
+                parent=self
+            )
+            self.engine.batch_finished.connect(self.on_batch_finished)
+
+    def run_task(self, task_id, offline=False):
+        """offline=True — селектор применяется к последнему снимку страницы (core.snapshot_store)"""
+        # Получаем данные задачи из хранилища
+        task = self._read_task(task_id)
+        if not task:
+            return
+
+        # Уже в очереди или выполняется — второй раз не ставим (например, по таймеру)
+        if task_id in self.active_ids:
             return
+        self.active_ids.add(task_id)
+        if offline:
+            self.offline_ids.add(task_id)
 
-        url = url_item.text().strip()
-        selector = selector_item.text().strip()
-        method = method_item.text().strip()
+        # Заблокировать редактирование
+        self.lock_task(task_id, True)
+
+        # Разбор снимка идёт через TaskWorker и при асинхронном движке — сеть не нужна
+        if self.engine and not offline:
+            self._mark_running(task_id)
+            params = self.task_params.get(task_id, {})
+            cookies = cookie_manager.load_cookies(task["url"]) or {}
+            self.engine.submit(task_id, task["url"], task["selector"], task["method"], params=params, cookies=cookies)
+        elif len(self.workers) < self.max_workers:
+            self._start_worker(task_id)
+        else:
+            self.pending.append(task_id)
+            self.model.set_task_value(task_id, COL_STATUS, STATUS_QUEUED)
+
+        self.update_lcd()
+
+    def reextract_tasks(self, task_ids):
+        """
+        Пакетный повторный разбор снимков страниц (без сети), параллельно.
+        Возвращает число поставленных задач.
+        """
+        tasks = []
+        for task_id in task_ids:
+            task = self._read_task(task_id)
+            if not task or task_id in self.active_ids:
+                continue
+            self.active_ids.add(task_id)
+            self.lock_task(task_id, True)
+            self._mark_running(task_id)
+            tasks.append((task_id, task["url"], task["selector"], task["method"]))
+
+        if not tasks:
+            return 0
+
+        from core.reextract import ReextractWorker
+        executor = None
+        if self.parse_in_process:
+            from core import parse_pool
+            executor = parse_pool.get_executor()
+
+        worker = ReextractWorker(
+            tasks, css_engine=self.css_engine, fingerprints=self.fingerprints,
+            executor=executor, include_html=self.include_html
+        )
+        worker.batch_finished.connect(self.on_batch_finished)
+        worker.finished.connect(lambda w=worker: self._release_reextract(w))
+        self.reextract_workers.append(worker)
+        worker.start()
+
+        self.update_lcd()
+        return len(tasks)
+
+    def _release_reextract(self, worker):
+        if worker in self.reextract_workers:
+            self.reextract_workers.remove(worker)
+        worker.deleteLater()
+
+    def _read_task(self, task_id):
+        record = self.model.store.get(task_id)
+        if record is None:
+            return None
+
+        url = record.url.strip()
+        selector = record.selector.strip()
+        method = record.method.strip()
 
         if not url or not selector:
-            return
+            return None
 
+        return {"url": url, "selector": selector, "method": method}
+
+    def _mark_running(self, task_id):
         # Статус
-        self.table.setItem(row, 4, self._create_item("⏳ Выполняется"))
+        self.model.set_task_value(task_id, COL_STATUS, "⏳ Выполняется")
 
         # Last Run
         now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.table.setItem(row, 10, self._create_item(now_str))
+        self.model.set_task_value(task_id, COL_LAST_RUN, now_str)
 
-        # Заблокировать редактирование
-        self.lock_row(row, True)
+    def _start_worker(self, task_id):
+        task = self._read_task(task_id)
+        offline = task_id in self.offline_ids
+        self.offline_ids.discard(task_id)
+        if not task:
+            # Задачу удалили или очистили, пока она ждала в очереди
+            self.active_ids.discard(task_id)
+            self.lock_task(task_id, False)
+            return
+
+        self._mark_running(task_id)
 
         # Параметры
-        params = self.task_params.get(row, {})
-        cookies = cookie_manager.load_cookies(url) or {}
+        params = self.task_params.get(task_id, {})
+        cookies = cookie_manager.load_cookies(task["url"]) or {}
 
         # Создаём и запускаем воркера
-        worker = TaskWorker(row, url, selector, method, params=params, cookies=cookies)
+        worker = TaskWorker(
+            task_id, task["url"], task["selector"], task["method"],
+            params=params, cookies=cookies,
+            parse_in_process=self.parse_in_process, css_engine=self.css_engine,
+            use_cache=self.use_cache, fingerprints=self.fingerprints,
+            snapshots=self.use_snapshots, offline=offline,
+            include_html=self.include_html
+        )
         worker.task_finished.connect(self.on_task_finished)
+        worker.finished.connect(lambda w=worker: self._release_worker(w))
         self.workers.append(worker)
         worker.start()
 
-    def on_task_finished(self, row_index, status_text, message, results, cookies):
-        self.table.setItem(row_index, 4, self._create_item(status_text))
-        colorize_row_by_status(self.table, row_index)
-        self.lock_row(row_index, False)  # 🔓 Разблокировать строку
+    def _release_worker(self, worker):
+        """Поток завершён — освобождаем слот и запускаем следующую задачу из очереди"""
+        if worker in self.workers:
+            self.workers.remove(worker)
+        worker.deleteLater()
+        self._start_pending()
+
+    def _start_pending(self):
+        started = False
+        while self.pending and len(self.workers) < self.max_workers:
+            self._start_worker(self.pending.popleft())
+            started = True
+        if started:
+            self.update_lcd()
+
+    def on_batch_finished(self, batch):
+        """Пачка результатов от AsyncScrapeEngine"""
+        for task_id, status_text, message, results, cookies in batch:
+            self.on_task_finished(task_id, status_text, message, results, cookies)
+
+    def cancel_task(self, task_id):
+        """Снимает задачу из очереди (или отменяет в асинхронном движке)"""
+        if task_id in self.pending:
+            self.pending.remove(task_id)
+            self.offline_ids.discard(task_id)
+            self.fingerprints.pop(task_id, None)
+            self.on_task_finished(task_id, "⏸️ Остановлено", "Задача снята с очереди", [], {})
+        elif any(worker.cancel(task_id) for worker in self.reextract_workers):
+            return
+        elif self.engine:
+            self.engine.cancel(task_id)
+
+    def shutdown(self):
+        if self.engine:
+            self.engine.shutdown()
+
+        # Очередь больше не нужна, ждём завершения уже запущенных потоков
+        self.pending.clear()
+        for worker in list(self.reextract_workers):
+            worker.cancel_all()
+        for worker in list(self.workers) + list(self.reextract_workers):
+            worker.wait()
+
+        # Результаты, не успевшие попасть в UI
+        self.flush_timer.stop()
+        self.flush_finished()
+
+        if self.parse_in_process:
+            from core import parse_pool
+            parse_pool.shutdown()
+
+    def on_task_finished(self, task_id, status_text, message, results, cookies):
+        """Буферизует результат; применяется пачкой в flush_finished (не чаще раза в flush_interval)"""
+        self.finished_buffer.append((task_id, status_text, message, results, cookies))
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def flush_finished(self):
+        """Применяет накопленные результаты: один пересчёт счётчиков и одна запись cookies на URL за пачку"""
+        batch, self.finished_buffer = self.finished_buffer, []
+        if not batch:
+            return
+
+        cookies_by_url = {}
+        for task_id, status_text, message, results, cookies in batch:
+            self.active_ids.discard(task_id)
+            if self.model.store.get(task_id) is None:
+                # Задачу удалили, пока она выполнялась
+                continue
+            self._apply_finished(task_id, status_text, message, results, cookies, cookies_by_url)
+
+        for url, cookies in cookies_by_url.items():
+            cookie_manager.save_cookies(url, cookies)
 
-        url = self.table.item(row_index, 1).text()
-        cookie_manager.save_cookies(url, cookies)
         self.update_lcd()
-        
-        self.task_results[row_index] = {
+        if self.batch_applied:
+            self.batch_applied()
+
+    def _apply_finished(self, task_id, status_text, message, results, cookies, cookies_by_url):
+        self.model.set_task_value(task_id, COL_STATUS, status_text)
+        self.lock_task(task_id, False)  # 🔓 Разблокировать строку
+
+        url = self.model.store.get(task_id).url
+
+        if status_text == STATUS_UNCHANGED:
+            self.on_task_unchanged(task_id, url, cookies, cookies_by_url)
+            return
+
+        if cookies is not None:  # None — повторный разбор снимка, куки не трогаем
+            cookies_by_url[url] = cookies
+        self.model.store.mark_dirty(task_id, results=True)  # для инкрементального сохранения сессии
+
+        self.task_results[task_id] = {
             "url": url,
             "status": status_text,
             "message": message,
@@ -68,10 +305,29 @@ class TaskManager(QObject):
             "last_run": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
 
-        self.table.resizeColumnsToContents()
-        self.update_tooltips(row_index)  # обновим tooltip (cookies, params и т.д.)
+        self.update_tooltips(task_id)  # обновим tooltip (cookies, params и т.д.)
+
+    def on_task_unchanged(self, task_id, url, cookies, cookies_by_url):
+        """Страница/результаты не изменились: прежние результаты остаются, файл результатов не переписывается"""
+        if cookies:
+            cookies_by_url[url] = cookies
+
+        previous = self.task_results.get(task_id)
+        if previous:
+            previous["last_run"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self.model.store.mark_dirty(task_id)  # сохранить новое время запуска (без результатов)
 
+    def forget_tasks(self, task_ids):
+        """Задачи удалены: снимаем их с очереди и забываем отпечатки"""
+        task_ids = set(task_ids)
+        if self.pending:
+            self.pending = deque(task_id for task_id in self.pending if task_id not in task_ids)
+        self.offline_ids -= task_ids
+        for task_id in task_ids:
+            self.fingerprints.pop(task_id, None)
+            if self.engine:
+                self.engine.cancel(task_id)
 
-    def _create_item(self, text):
-        from PyQt5.QtWidgets import QTableWidgetItem
-        return QTableWidgetItem(text)
+    def forget_fingerprints(self):
+        """Сбрасывает отпечатки (загружена другая сессия)"""
+        self.fingerprints.clear()
@@ -0,0 +1,168 @@
+# core/task_store.py
+
+from collections import defaultdict
+from itertools import count
+
+
+class TaskRecord:
+    """Компактная запись задачи: только поля строки таблицы, без __dict__"""
+
+    __slots__ = (
+        "task_id", "url", "selector", "method", "status", "cookies_file",
+        "params_label", "timer_label", "last_run", "locked"
+    )
+
+    def __init__(self, task_id, url, selector, method, status, cookies_file="",
+                 params_label="🛠 Настроить", timer_label="", last_run=""):
+        self.task_id = task_id
+        self.url = url
+        self.selector = selector
+        self.method = method
+        self.status = status
+        self.cookies_file = cookies_file
+        self.params_label = params_label
+        self.timer_label = timer_label
+        self.last_run = last_run
+        self.locked = False
+
+
+class TaskStore:
+    """
+    Хранилище задач с неизменяемыми ID.
+    Порядок строк — список ID; индекс по статусу обновляется на изменениях,
+    поэтому счётчики статусов (LCD) не сканируют все задачи.
+    Параметры, результаты, интервалы и т.п. хранятся в словарях по task_id.
+    Изменённые с прошлого сохранения задачи помечаются как "грязные" (take_dirty):
+    отдельно поля/параметры и результаты — результаты обычно самое тяжёлое при записи.
+    """
+
+    def __init__(self):
+        self._records = {}                  # task_id -> TaskRecord
+        self._order = []                    # task_id в порядке строк
+        self._row_of = {}                   # task_id -> строка
+        self._by_status = defaultdict(set)  # status -> {task_id}
+        self._ids = count(1)                # ID не переиспользуются даже после clear()
+        self._dirty = set()                 # task_id, изменённые с прошлого сохранения
+        self._dirty_results = set()         # task_id с новыми результатами
+
+    def __len__(self):
+        return len(self._order)
+
+    def __iter__(self):
+        return (self._records[task_id] for task_id in self._order)
+
+    # ============================
+    # 🔹 Доступ
+    # ============================
+
+    def get(self, task_id):
+        return self._records.get(task_id)
+
+    def at(self, row):
+        return self._records[self._order[row]]
+
+    def id_at(self, row):
+        return self._order[row] if 0 <= row < len(self._order) else None
+
+    def row_of(self, task_id):
+        """Текущая строка задачи или -1, если задача удалена"""
+        return self._row_of.get(task_id, -1)
+
+    def ids(self):
+        return list(self._order)
+
+    def count_status(self, status):
+        return len(self._by_status.get(status, ()))
+
+    def status_counts(self):
+        return {status: len(ids) for status, ids in self._by_status.items() if ids}
+
+    # ============================
+    # 🔹 Изменение
+    # ============================
+
+    def add(self, url, selector, method, status, **fields):
+        record = TaskRecord(next(self._ids), url, selector, method, status, **fields)
+        self._records[record.task_id] = record
+        self._row_of[record.task_id] = len(self._order)
+        self._order.append(record.task_id)
+        self._index(record)
+        self._dirty.add(record.task_id)
+        return record
+
+    def add_many(self, items):
+        """items — словари с аргументами add(); возвращает список записей"""
+        return [self.add(**item) for item in items]
+
+    def update(self, task_id, field, value):
+        """Меняет поле записи, поддерживая индекс статусов; True, если значение изменилось"""
+        record = self._records.get(task_id)
+        if record is None or getattr(record, field) == value:
+            return False
+
+        if field == "status":
+            self._unindex(record)
+            setattr(record, field, value)
+            self._index(record)
+        else:
+            setattr(record, field, value)
+        self._dirty.add(task_id)
+        return True
+
+    def remove(self, task_ids):
+        """Удаляет задачи; строки остальных пересчитываются один раз"""
+        task_ids = set(task_ids) & self._records.keys()
+        if not task_ids:
+            return []
+
+        for task_id in task_ids:
+            self._unindex(self._records.pop(task_id))
+        # Удаление тоже меняет сессию (состав задач)
+        self._dirty.update(task_ids)
+        self._order = [task_id for task_id in self._order if task_id not in task_ids]
+        self._row_of = {task_id: row for row, task_id in enumerate(self._order)}
+        return list(task_ids)
+
+    def clear(self):
+        self._records.clear()
+        self._order.clear()
+        self._row_of.clear()
+        self._by_status.clear()
+        self._dirty.clear()
+        self._dirty_results.clear()
+
+    # ============================
+    # 🔹 Изменения для сохранения
+    # ============================
+
+    def mark_dirty(self, task_id, results=False):
+        """Отмечает изменение вне полей записи (параметры, интервал; results=True — результаты)"""
+        if task_id in self._records:
+            self._dirty.add(task_id)
+            if results:
+                self._dirty_results.add(task_id)
+
+    def mark_dirty_many(self, task_ids, result_ids=()):
+        """Возвращает пометки обратно (например, сохранение не удалось)"""
+        self._dirty.update(task_ids)
+        self._dirty_results.update(result_ids)
+
+    def take_dirty(self):
+        """Возвращает и сбрасывает изменённые task_id: (все изменённые, с новыми результатами)"""
+        dirty, self._dirty = self._dirty, set()
+        dirty_results, self._dirty_results = self._dirty_results, set()
+        return dirty, dirty_results
+
+    # ============================
+    # 🔹 Индексы
+    # ============================
+
+    def _index(self, record):
+        self._by_status[record.status].add(record.task_id)
+
+    def _unindex(self, record):
+        ids = self._by_status.get(record.status)
+        if ids is not None:
+            ids.discard(record.task_id)
+            if not ids:
+                del self._by_status[record.status]
@@ -1,47 +1,79 @@
 from PyQt5.QtCore import QThread, pyqtSignal
-from core.scraper import scrape_website
+from core.scraper import fetch_page, extract_page, normalize_url, FetchResult
+from core.results import count_results
+from core import fingerprint
+from core import snapshot_store
 
 class TaskWorker(QThread):
     # 🔄 Добавили cookies в сигнал
-    task_finished = pyqtSignal(int, str, str, list, dict)  # row_index, status, message, results, cookies
+    # results — list или dict {поле: list} для именованных селекторов
+    task_finished = pyqtSignal(int, str, str, object, dict)  # task_id, status, message, results, cookies
 
-    def __init__(self, row_index, url, selector, method, params=None, cookies=None):
+    def __init__(self, task_id, url, selector, method, params=None, cookies=None, parse_in_process=False, css_engine="lxml", use_cache=False, fingerprints=None, snapshots=False, offline=False, include_html=False):
         super().__init__()
-        self.row_index = row_index
+        self.task_id = task_id
         self.url = url
         self.selector = selector
         self.method = method
         self.params = params or {}
         self.cookies = cookies or {}
+        self.parse_in_process = parse_in_process
+        self.css_engine = css_engine
+        self.use_cache = use_cache
+        # task_id -> отпечаток прошлого запуска (общий словарь TaskManager)
+        self.fingerprints = fingerprints if fingerprints is not None else {}
+        self.snapshots = snapshots  # сохранять тело страницы в core.snapshot_store
+        self.offline = offline      # разбирать последний снимок вместо запроса к сайту
+        self.include_html = include_html  # внешний HTML элемента в записях результатов
 
     def run(self):
         try:
             use_xpath = self.method.lower() == "xpath"
 
-            # 🔽 Парсим сайт, получаем результат + session.cookies
-            results, final_cookies = scrape_website(
-                url=self.url,
-                selector=self.selector,
-                use_xpath=use_xpath,
+            # 🔽 Скачиваем страницу (или берём снимок), получаем тело + session.cookies
+            page = self.load_snapshot() if self.offline else fetch_page(
+                self.url,
                 proxy=self.params.get("proxy"),
                 headers=self.params.get("headers"),
                 user_agent=self.params.get("user_agent"),
                 timeout=self.params.get("timeout", 10),
-                cookies=self.cookies
+                cookies=self.cookies,
+                use_cache=self.use_cache
             )
+            final_cookies = page.cookies
+            changed_cookies = final_cookies if final_cookies != self.cookies else {}
+
+            # 🟰 Тело не изменилось с прошлого запуска — не разбираем страницу
+            previous = self.fingerprints.get(self.task_id)
+            current = fingerprint.page_fingerprint(page.body, self.selector, self.method, self.css_engine, include_html=self.include_html)
+            if self.snapshots and not self.offline:
+                snapshot_store.store.save(page.url, page.body, page.encoding, digest=current["body"])
+            if fingerprint.same_page(previous, current):
+                self.task_finished.emit(self.task_id, fingerprint.STATUS_UNCHANGED, "Страница не изменилась", None, changed_cookies)
+                return
+
+            results = extract_page(page, self.selector, use_xpath, self.parse_in_process, self.css_engine, self.include_html)
+
+            current["results"] = fingerprint.results_hash(results)
+            unchanged = fingerprint.same_results(previous, current)
+            self.fingerprints[self.task_id] = current
+
+            if unchanged:
+                self.task_finished.emit(self.task_id, fingerprint.STATUS_UNCHANGED, "Результаты не изменились", None, changed_cookies)
+                return
 
             # 🔼 Передаём всё: статус, сообщение, данные, cookies
-            if results:
+            if count_results(results):
                 self.task_finished.emit(
-                    self.row_index,
+                    self.task_id,
                     "✅ Успешно",
-                    f"Найдено элементов: {len(results)}",
+                    f"Найдено элементов: {count_results(results)}",
                     results,
                     final_cookies
                 )
             else:
                 self.task_finished.emit(
-                    self.row_index,
+                    self.task_id,
                     "✅ Успешно",
                     "Элементов не найдено",
                     results,
@@ -49,11 +81,20 @@ class TaskWorker(QThread):
                 )
 
         except Exception as e:
-            # ⛔ В случае ошибки — пустые результаты, куки не обновляем
+            # ⛔ В случае ошибки — пустые результаты, куки не обновляем; отпечаток больше не отвечает записи задачи
+            self.fingerprints.pop(self.task_id, None)
             self.task_finished.emit(
-                self.row_index,
+                self.task_id,
                 "❌ Ошибка",
                 str(e),
                 [],
                 self.cookies
             )
+
+    def load_snapshot(self):
+        """Последний снимок страницы как FetchResult (куки задачи не меняются)"""
+        snapshot = snapshot_store.store.load(normalize_url(self.url))
+        if snapshot is None:
+            raise RuntimeError("Нет сохранённого снимка страницы")
+        body, encoding, _ = snapshot
+        return FetchResult(normalize_url(self.url), body, encoding, dict(self.cookies), from_cache=True)
@@ -2,6 +2,7 @@ from PyQt5.QtWidgets import QDialog, QVBoxLayout, QPushButton, QHBoxLayout, QMes
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 from datetime import datetime
+from core.results import count_results
 
 
 class AnalyticsDialog(QDialog):
@@ -80,7 +81,7 @@ class AnalyticsDialog(QDialog):
                 short_label = short_label[:25] + "..."
 
             labels.append(short_label)
-            counts.append(len(results))
+            counts.append(count_results(results))
 
         if not labels:
             ax.text(0.5, 0.5, "Нет данных для отображения", ha="center", va="center", fontsize=12)
@@ -162,7 +163,7 @@ class AnalyticsDialog(QDialog):
                 continue
 
             times.append(time_obj)
-            counts.append(len(results))
+            counts.append(count_results(results))
 
             url = task.get("url", f"Row {row}")
             short = url.replace("https://", "").replace("http://", "")
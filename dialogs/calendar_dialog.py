@@ -1,21 +1,24 @@
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QCalendarWidget,
-    QListWidget, QLabel, QPushButton, QMessageBox
+    QListWidget, QListWidgetItem, QLabel, QPushButton, QMessageBox
 )
-from PyQt5.QtCore import QDate
+from PyQt5.QtCore import Qt, QDate
 from PyQt5.QtGui import QTextCharFormat, QBrush, QColor
 from datetime import datetime
 from core.session_service import list_sessions, load_session
 
 
 class CalendarDialog(QDialog):
-    def __init__(self, parent, task_results, load_session_callback):
+    def __init__(self, parent, task_results, load_session_callback, row_of):
         super().__init__(parent)
         self.setWindowTitle("📆 История по дате")
         self.resize(800, 500)
 
         self.task_results = task_results or {}
         self.load_session_callback = load_session_callback
+        self.row_of = row_of  # task_id -> текущая строка таблицы (-1 — задача удалена)
+        # Список сессий (из индекса) читаем один раз, а не на каждый клик по дате
+        self.sessions = list_sessions()
 
         # Layouts
         main_layout = QHBoxLayout(self)
@@ -76,7 +79,7 @@ class CalendarDialog(QDialog):
                     continue
 
         session_dates = set()
-        for session in list_sessions():
+        for session in self.sessions:
             dt_str = session.get("datetime", "")
             if dt_str:
                 try:
@@ -100,18 +103,24 @@ class CalendarDialog(QDialog):
         # Filter task_results
         self.task_list.clear()
         self.filtered_rows = []
-        for row, data in self.task_results.items():
+        # task_results — по task_id; ID не совпадает с номером строки, строку даёт модель
+        for task_id, data in self.task_results.items():
             last_run = data.get("last_run", "")
             if last_run.startswith(self.selected_str):
+                row = self.row_of(task_id)
+                if row < 0:
+                    continue
                 self.task_list.addItem(f"#{row+1} → {data.get('url')}")
                 self.filtered_rows.append(row)
 
         # Filter sessions
         self.session_list.clear()
-        for session in list_sessions():
+        for session in self.sessions:
             session_date = session.get("datetime", "").split(" ")[0]
             if session_date == self.selected_str:
-                self.session_list.addItem(session.get("session_name"))
+                item = QListWidgetItem(session.get("session_name"))
+                item.setData(Qt.UserRole, session.get("path"))  # файл JSON или "sqlite:<имя>"
+                self.session_list.addItem(item)
 
     def load_selected_session(self):
         item = self.session_list.currentItem()
@@ -119,8 +128,7 @@ class CalendarDialog(QDialog):
             QMessageBox.warning(self, "Ошибка", "Выберите сессию для загрузки")
             return
 
-        session_name = item.text()
-        path = f"sessions/{session_name}.json"
+        path = item.data(Qt.UserRole)
         session_data = load_session(path)
         self.load_session_callback(session_data)
         self.accept()
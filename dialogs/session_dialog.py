@@ -1,3 +1,4 @@
+from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QDialog, QVBoxLayout, QTableWidget, QTableWidgetItem, QPushButton, QHBoxLayout, QMessageBox
 from core import session_service
 
@@ -40,7 +41,9 @@ class SessionHistoryDialog(QDialog):
         self.table.setRowCount(len(sessions))
 
         for i, session in enumerate(sessions):
-            self.table.setItem(i, 0, QTableWidgetItem(session["session_name"]))
+            name_item = QTableWidgetItem(session["session_name"])
+            name_item.setData(Qt.UserRole, session["path"])  # файл JSON или "sqlite:<имя>"
+            self.table.setItem(i, 0, name_item)
             self.table.setItem(i, 1, QTableWidgetItem(session["datetime"]))
             self.table.setItem(i, 2, QTableWidgetItem(str(session["task_count"])))
             self.table.setRowHeight(i, 30)
@@ -51,9 +54,7 @@ class SessionHistoryDialog(QDialog):
         row = self.table.currentRow()
         if row < 0:
             return None
-        file_name = self.table.item(row, 0).text()
-        full_path = f"sessions/{file_name}.json"
-        return full_path
+        return self.table.item(row, 0).data(Qt.UserRole)
 
     def load_selected_session(self):
         path = self.get_selected_path()
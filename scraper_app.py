@@ -1,10 +1,13 @@
-from PyQt5.QtWidgets import QMainWindow, QFileDialog, QPushButton, QMenu, QDialog
+from PyQt5.QtWidgets import QMainWindow, QFileDialog, QMenu, QDialog, QLabel, QProgressDialog
 from PyQt5.QtCore import Qt, QTimer
 # Core import
-from core.exporter import save_to_csv, save_to_excel, export_data_to_json
+from core.exporter import save_to_csv, save_to_excel, save_to_columnar, export_data_to_json, EXPORT_FILTERS
+from core.export_worker import ExportWorker
 from core import cookie_manager
-from core.storage import load_settings, save_settings
-from core.session_service import SessionController
+from core import http_client
+from core import selector_cache
+from core.storage import load_settings, save_settings, DEFAULT_SETTINGS
+from core.session_service import SessionController, generate_session_name
 # Date import
 from datetime import datetime
 # pyright: reportMissingImports=false
@@ -15,11 +18,13 @@ from ui import table_utils
 # Дополнительно — импорт часто используемых функций напрямую
 from ui.table_utils import (
     update_lcd_counters,
-    colorize_row_by_status,
-    add_task_row as base_add_task_row,
-    create_save_button
+    add_task_row as base_add_task_row
 )
 from ui.table_controller import TableController
+from ui.task_model import (
+    TaskTableModel, COL_URL, COL_SAVE, COL_COOKIES, COL_PARAMS, COL_TIMER, COL_LAST_RUN
+)
+from ui.delegates import ButtonDelegate
 from ui import editor_handlers
 from ui.scraper_ui import Ui_MainWindow
 # Utils import
@@ -43,29 +48,48 @@ class ScraperApp(QMainWindow):
         super().__init__()
         self.ui = Ui_MainWindow()
         self.ui.setupUi(self)
-        
+
+        # 📋 Модель задач: QTableView + QAbstractTableModel, кнопки — делегаты
+        self.task_model = TaskTableModel(parent=self)
+        self.task_model.tooltip_provider = self.task_tooltip
+        self.ui.tasks_table.setModel(self.task_model)
+
+        self.save_delegate = ButtonDelegate("💾 Сохранить", self)
+        self.save_delegate.clicked.connect(self.save_task_result)
+        self.ui.tasks_table.setItemDelegateForColumn(COL_SAVE, self.save_delegate)
+
+        self.cookie_delegate = ButtonDelegate("🍪 Куки", self)
+        self.cookie_delegate.clicked.connect(self.load_cookie_file)
+        self.ui.tasks_table.setItemDelegateForColumn(COL_COOKIES, self.cookie_delegate)
+
         # Calendar Widget
         self.ui.action_open_calendar.triggered.connect(self.open_calendar_dialog)
 
         # Column settings
         self.load_column_widths()
 
+        # HTTP pool settings
+        self.configure_http_pool()
+
         # 📦 Инициализация ВСЕХ рабочих структур ДО добавления задач
-        self.task_params = {}     # row -> request params
-        self.task_intervals = {}  # row -> seconds
-        self.task_timers = {}     # row -> QTimer
-        self.task_results = {}    # row -> result list
+        # Ключи — неизменяемые task_id из core.task_store (не номера строк)
+        self.task_params = {}     # task_id -> request params
+        self.task_intervals = {}  # task_id -> seconds
+        self.task_timers = {}     # task_id -> QTimer
+        self.task_results = {}    # task_id -> result list
         self.workers = []         # list of TaskWorker
+        self.export_worker = None # ExportWorker пакетного экспорта
 
         # ✅ Инициализация TaskManager
         from core.task_manager import TaskManager
         self.task_manager = TaskManager(
-            table=self.ui.tasks_table,
+            model=self.task_model,
             task_results=self.task_results,
             task_params=self.task_params,
             update_lcd_callback=self.update_lcd,
             update_tooltips_callback=self.update_tooltips,
-            lock_row_callback=self.lock_row
+            lock_task_callback=self.lock_task,
+            batch_applied_callback=self.resize_task_columns
         )
         
         # Table controller
@@ -77,7 +101,6 @@ class ScraperApp(QMainWindow):
         # SessionControler
         self.session_controller = SessionController(
             table_controller=self.table_controller,
-            add_task_callback=self.add_task_row,  # метод, который добавляет строку в таблицу
             task_params=self.task_params,
             task_results=self.task_results,
             task_intervals=self.task_intervals
@@ -98,7 +121,7 @@ class ScraperApp(QMainWindow):
         self.ui.tasks_table.customContextMenuRequested.connect(self.show_table_context_menu)
 
         # 📌 Двойной клик — редактирование
-        self.ui.tasks_table.cellDoubleClicked.connect(self.edit_cell_handler)
+        self.ui.tasks_table.doubleClicked.connect(lambda index: self.edit_cell_handler(index.row(), index.column()))
 
         # 📌 Toolbar действия
         self.ui.action_add_task_2.triggered.connect(self.add_template_task)
@@ -121,35 +144,31 @@ class ScraperApp(QMainWindow):
             "running": self.ui.lcd_running,
             "success": self.ui.lcd_success,
             "error": self.ui.lcd_error,
-            "stopped": self.ui.lcd_stopped
+            "stopped": self.ui.lcd_stopped,
+            "queued": self.ui.lcd_queued
         }
 
+        # HTTP connections stats in status bar
+        self.http_stats_label = QLabel()
+        self.statusBar().addPermanentWidget(self.http_stats_label)
+        self.selector_stats_label = QLabel()
+        self.statusBar().addPermanentWidget(self.selector_stats_label)
+        self.update_http_stats()
+
+        # 💾 Фоновое автосохранение сессии (только изменённые задачи)
+        self.autosave_name = None
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.timeout.connect(self.autosave_session)
+        self.configure_autosave()
+
 
     # ============================
     # 🔹 Действия
     # ============================
 
     def add_task_row(self, url, selector, method, status):
-        row_position = self.ui.tasks_table.rowCount()
-
-        # 🔹 Добавляем строку через table_logic
-        base_add_task_row(self.ui.tasks_table, url, selector, method, status)
-
-        # 🔹 Кнопка "Сохранить"
-        save_button = create_save_button()
-        save_button.clicked.connect(lambda _, r=row_position: self.save_task_result(r))
-        self.ui.tasks_table.setCellWidget(row_position, 6, save_button)
-        
-        # COOKIE BUTTON IN TABLE
-        cookie_button = QPushButton("🍪 Куки")
-        cookie_button.clicked.connect(lambda _, r=row_position: self.load_cookie_file(r))
-        self.ui.tasks_table.setCellWidget(row_position, 7, cookie_button)
-        
-        # 🔹 Вот сюда ДОБАВЬ ⬇️ пустую ячейку для Last Run
-        self.ui.tasks_table.setItem(row_position, 10, self.create_item("")) 
-        
-        # Update Toolbar Tips
-        self.update_tooltips(row_position)
+        # 🔹 Добавляем строку в модель; кнопки Save / Cookies рисуют делегаты
+        return base_add_task_row(self.task_model, url, selector, method, status)
 
 
     def add_template_task(self):
@@ -157,11 +176,20 @@ class ScraperApp(QMainWindow):
         self.update_lcd()
     
     def delete_task(self):
-        table_utils.delete_selected_row(self.ui.tasks_table)
+        self.forget_tasks(table_utils.delete_selected_row(self.ui.tasks_table))
         self.update_lcd()
 
+    def forget_tasks(self, task_ids):
+        """Убирает всё, что связано с удалёнными задачами: параметры, результаты, таймеры"""
+        for task_id in task_ids:
+            self.task_params.pop(task_id, None)
+            self.task_results.pop(task_id, None)
+            self.task_intervals.pop(task_id, None)
+            self.stop_task_timer(task_id)
+        self.task_manager.forget_tasks(task_ids)
+
     def run_task_stub(self):
-        row = self.ui.tasks_table.currentRow()
+        row = self.ui.tasks_table.currentIndex().row()
         if row >= 0:
             self.table_controller.update_row_status(row, "⏳ Выполняется")
         self.update_lcd()
@@ -182,8 +210,9 @@ class ScraperApp(QMainWindow):
         if column == 9:
             menu = QMenu()
 
-            menu.addAction("🔁 Переустановить таймер", lambda: self.edit_timer_for_row(row))
-            menu.addAction("⏹ Отключить таймер", lambda: self.configure_task_timer(row, 0))
+            task_id = self.task_model.task_id(row)
+            menu.addAction("🔁 Переустановить таймер", lambda: self.edit_timer_for_task(task_id))
+            menu.addAction("⏹ Отключить таймер", lambda: self.configure_task_timer(task_id, 0))
 
             menu.exec_(self.ui.tasks_table.viewport().mapToGlobal(position))
             return
@@ -193,7 +222,7 @@ class ScraperApp(QMainWindow):
             self,
             self.ui.tasks_table,
             position,
-            lambda: update_lcd_counters(self.ui.tasks_table, self.lcd_counters),
+            lambda: update_lcd_counters(self.task_model, self.lcd_counters),
             self.run_selected_task,
             self.add_task_row
         )
@@ -204,7 +233,7 @@ class ScraperApp(QMainWindow):
 
     def edit_cell_handler(self, row, column):
         if column == 9:  # Таймер
-            self.configure_timer_dialog(row)
+            self.configure_timer_dialog(self.task_model.task_id(row))
             return
 
         if column == 8:  # Params
@@ -218,14 +247,16 @@ class ScraperApp(QMainWindow):
         )
         
     def edit_params_modal(self, row):
-        old_params = self.task_params.get(row, {})
+        task_id = self.task_model.task_id(row)
+        old_params = self.task_params.get(task_id, {})
         result = show_params_dialog(self, old_params)
         
         if result:
-            self.task_params[row] = result
-            self.ui.tasks_table.setItem(row, 8, self.create_item("✅ Настроено"))
+            self.task_params[task_id] = result
+            self.task_model.store.mark_dirty(task_id)
+            self.task_model.set_task_value(task_id, COL_PARAMS, "✅ Настроено")
             self.statusBar().showMessage(f"🛠 Параметры обновлены для строки #{row + 1}")
-            self.update_tooltips(row)  # ⬅️ Обновляем подсказку
+            self.update_tooltips(task_id)  # ⬅️ Обновляем подсказку
         else:
             self.statusBar().showMessage("❌ Параметры не были изменены")
 
@@ -236,54 +267,63 @@ class ScraperApp(QMainWindow):
 
     def update_lcd(self):
         table_utils.update_lcd_counters(
-            self.ui.tasks_table,
+            self.task_model,
             {
                 'total': self.ui.lcd_total,
                 'running': self.ui.lcd_running,
                 'success': self.ui.lcd_success,
                 'error': self.ui.lcd_error,
                 'stopped': self.ui.lcd_stopped,
+                'queued': self.ui.lcd_queued,
             }
         )
+        self.update_http_stats()
+
+    def resize_task_columns(self):
+        # Один раз на пачку завершённых задач (TaskManager.flush_finished), а не на каждую
+        self.ui.tasks_table.resizeColumnsToContents()
+
+    def update_http_stats(self):
+        if not hasattr(self, "http_stats_label"):
+            return
+        stats = http_client.get_stats()
+        self.http_stats_label.setText(
+            f"🔌 HTTP: клиентов {stats['clients']} | "
+            f"открыто {stats['opened']} | переиспользовано {stats['reused']}"
+        )
+        if self.task_manager.parse_in_process:
+            # Разбор идёт в процессах parse_pool — у них свои кэши, здешние счётчики всегда нули
+            self.selector_stats_label.setText("🎯 Селекторы: кэш в процессах разбора")
+            return
+        cache_stats = selector_cache.get_stats()
+        self.selector_stats_label.setText(
+            f"🎯 Селекторы: попаданий {cache_stats['hits']} | промахов {cache_stats['misses']}"
+        )
+
+    def configure_http_pool(self):
+        settings = load_settings()
+        http_client.registry.configure(
+            pool_size=settings.get("http_pool_size", DEFAULT_SETTINGS["http_pool_size"]),
+            idle_timeout=settings.get("http_idle_timeout", DEFAULT_SETTINGS["http_idle_timeout"])
+        )
         
     def run_selected_task(self):
-        row = self.ui.tasks_table.currentRow()
+        row = self.ui.tasks_table.currentIndex().row()
         if row < 0:
             self.statusBar().showMessage("⚠ Выберите задачу для запуска")
             return
-        self.task_manager.run_task(row)
-
-    def on_task_finished(self, row_index, status_text, message, results, cookies):
-        
-        self.ui.tasks_table.setItem(row_index, 4, self.create_item(status_text))
-        colorize_row_by_status(self.ui.tasks_table, row_index)
-        self.lock_row(row_index, False)  # 🔓 Разблокировать строку
-        task = self.table_controller.get_task_data(row_index)
-        url = task["url"]
-        cookie_manager.save_cookies(url, cookies)
-        self.statusBar().showMessage(f"Задача #{row_index + 1} завершена: {message}")
-        self.update_lcd()
-
-        task = self.table_controller.get_task_data(row_index)
-        url = task["url"]
-
-        self.task_results[row_index] = {
-            "url": url,
-            "status": status_text,
-            "message": message,
-            "results": results,
-            "last_run": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
-        self.ui.tasks_table.resizeColumnsToContents()
-
-    def create_item(self, text):
-        from PyQt5.QtWidgets import QTableWidgetItem
-        return QTableWidgetItem(text)
+        self.task_manager.run_task(self.task_model.task_id(row))
 
+    def run_selected_task_offline(self):
+        """Повторный разбор последнего снимка страницы (без запроса к сайту)"""
+        row = self.ui.tasks_table.currentIndex().row()
+        if row < 0:
+            self.statusBar().showMessage("⚠ Выберите задачу для запуска")
+            return
+        self.task_manager.run_task(self.task_model.task_id(row), offline=True)
 
     def save_task_result(self, row_index):
-        task = self.task_results.get(row_index)
+        task = self.task_results.get(self.task_model.task_id(row_index))
         if not task or not task.get("results"):
             self.statusBar().showMessage("⚠ Нет данных для сохранения")
             return
@@ -292,7 +332,8 @@ class ScraperApp(QMainWindow):
         results = task["results"]
 
         file_path, _ = QFileDialog.getSaveFileName(self, "Сохранить результат", "", 
-                                                "JSON (*.json);;CSV (*.csv);;Excel (*.xlsx)")
+                                                "JSON (*.json);;CSV (*.csv);;Excel (*.xlsx);;"
+                                                "Parquet (*.parquet);;Arrow / Feather (*.feather)")
 
         if not file_path:
             return
@@ -301,6 +342,8 @@ class ScraperApp(QMainWindow):
             save_to_csv({url: results}, file_path)
         elif file_path.endswith(".xlsx"):
             save_to_excel({url: results}, file_path)
+        elif file_path.endswith((".parquet", ".feather", ".arrow")):
+            save_to_columnar([task], file_path)
         else:
             data = export_data_to_json({url: results}, format_type="default")
             with open(file_path, "w", encoding="utf-8") as f:
@@ -310,16 +353,9 @@ class ScraperApp(QMainWindow):
         self.statusBar().showMessage(f"✅ Сохранено: {file_path}")
         
         
-    def lock_row(self, row_index, lock=True):
-        """Блокирует или разблокирует редактирование ячеек строки."""
-        for col in range(1, 4):  # URL, Selector, Method — колонки 1, 2, 3
-            item = self.ui.tasks_table.item(row_index, col)
-            if item:
-                flags = item.flags()
-                if lock:
-                    item.setFlags(flags & ~Qt.ItemIsEditable)
-                else:
-                    item.setFlags(flags | Qt.ItemIsEditable)
+    def lock_task(self, task_id, lock=True):
+        """Блокирует или разблокирует редактирование URL / Selector / Method задачи."""
+        self.task_model.set_locked(task_id, lock)
                     
     
     def load_cookie_file(self, row_index):
@@ -346,12 +382,31 @@ class ScraperApp(QMainWindow):
     # RESTORE SESSION
         
     def restore_session(self, session_data):
+        for task_id in list(self.task_timers):
+            self.stop_task_timer(task_id)
+        self.task_manager.forget_fingerprints()
         self.session_controller.restore_session(session_data)
         self.statusBar().showMessage("Сессия восстановлена успешно")
    
     # SAVE SESSION
     # SAVE SESSION
         
+    def configure_autosave(self):
+        settings = load_settings()
+        if settings.get("auto_save", DEFAULT_SETTINGS["auto_save"]):
+            interval = settings.get("auto_save_interval", DEFAULT_SETTINGS["auto_save_interval"])
+            self.autosave_timer.start(max(1, int(interval)) * 1000)
+        else:
+            self.autosave_timer.stop()
+
+    def autosave_session(self):
+        # Имя — последняя сохранённая/загруженная сессия, иначе одно сгенерированное на запуск
+        name = self.session_controller.saved_name or self.autosave_name
+        if not name:
+            name = self.autosave_name = generate_session_name()
+        if self.session_controller.autosave(name):
+            self.statusBar().showMessage(f"💾 Автосохранение: {name}", 3000)
+
     def save_current_session(self):
         from PyQt5.QtWidgets import QInputDialog
         name, ok = QInputDialog.getText(self, "Сохранение сессии", "Введите имя сессии:")
@@ -388,7 +443,7 @@ class ScraperApp(QMainWindow):
 
         field_to_column = {"URL": 1, "Selector": 2, "Status": 4, "Last Run": 10}
 
-        for row in range(self.ui.tasks_table.rowCount()):
+        for row in range(self.task_model.rowCount()):
             match = True
 
             for field, values in grouped.items():
@@ -396,8 +451,7 @@ class ScraperApp(QMainWindow):
                 if col_index is None:
                     continue
 
-                item = self.ui.tasks_table.item(row, col_index)
-                cell_text = item.text().lower() if item else ""
+                cell_text = self.task_model.value(row, col_index).lower()
 
                 if field == "Selector":
                     selectors = [s.strip() for s in cell_text.split(",")]
@@ -414,132 +468,175 @@ class ScraperApp(QMainWindow):
             
     # TIMER SETTINGS BLOCK
     
-    def configure_timer_dialog(self, row):
-        current = self.task_intervals.get(row, 0)
+    def configure_timer_dialog(self, task_id):
+        current = self.task_intervals.get(task_id, 0)
         dialog = TimerDialog(self, current_seconds=current)
         if dialog.exec_():
             seconds = dialog.result_seconds or 0
-            self.task_intervals[row] = seconds
-            label = "Отключено" if seconds == 0 else f"⏱ {seconds // 60} мин"
-            self.ui.tasks_table.setItem(row, 9, self.create_item(label))
-            self.configure_task_timer(row, seconds)
+            self.configure_task_timer(task_id, seconds)
             
     # TIMER CONFIGURE
 
-    def configure_task_timer(self, row, seconds):
+    def configure_task_timer(self, task_id, seconds):
         # ⛔ Безопасно останавливаем старый таймер
-        old_timer = self.task_timers.get(row)
-        if old_timer and not sip.isdeleted(old_timer):
-            old_timer.stop()
-            old_timer.deleteLater()
+        self.stop_task_timer(task_id)
 
         # Обновляем интервал
-        self.task_intervals[row] = seconds
+        self.task_intervals[task_id] = seconds
+        self.task_model.store.mark_dirty(task_id)
 
         # Обновляем отображение в колонке
         label = "Отключено" if seconds == 0 else f"⏱ {seconds // 60} мин"
-        self.ui.tasks_table.setItem(row, 9, self.create_item(label))
+        self.task_model.set_task_value(task_id, COL_TIMER, label)
 
         # Если задан новый интервал — создаём таймер
         if seconds > 0:
             timer = QTimer(self)
-            timer.timeout.connect(lambda r=row: self.run_scheduled_task(r))
+            timer.timeout.connect(lambda t=task_id: self.run_scheduled_task(t))
             timer.start(seconds * 1000)
-            self.task_timers[row] = timer
+            self.task_timers[task_id] = timer
 
-        self.update_tooltips(row)
+        self.update_tooltips(task_id)
+
+    def stop_task_timer(self, task_id):
+        old_timer = self.task_timers.pop(task_id, None)
+        if old_timer and not sip.isdeleted(old_timer):
+            old_timer.stop()
+            old_timer.deleteLater()
 
     
     # START TIMER
     
-    def run_scheduled_task(self, row):
-        self.ui.tasks_table.selectRow(row)
+    def run_scheduled_task(self, task_id):
+        if self.task_model.row_of(task_id) < 0:
+            self.stop_task_timer(task_id)
+            return
 
         # 🕓 Устанавливаем время последнего запуска
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.table_controller.set_last_run(row, timestamp)
-        self.run_selected_task()
+        self.task_model.set_task_value(task_id, COL_LAST_RUN, timestamp)
+        self.task_manager.run_task(task_id)
         
     # EDIT TIMER METHOD
     
-    def edit_timer_for_row(self, row):
-        current_seconds = self.task_intervals.get(row, 0)
+    def edit_timer_for_task(self, task_id):
+        current_seconds = self.task_intervals.get(task_id, 0)
         dialog = TimerDialog(self, current_seconds=current_seconds)
 
         if dialog.exec_() == QDialog.Accepted:
             seconds = dialog.result_seconds
-            self.configure_task_timer(row, seconds)
-            self.update_tooltips(row)
+            self.configure_task_timer(task_id, seconds)
 
         
     # TOOLBAR TIPS EXPLANATION
     
-    def update_tooltips(self, row):
-        url_item = self.ui.tasks_table.item(row, 1)
-        params_item = self.ui.tasks_table.item(row, 8)
-        timer_item = self.ui.tasks_table.item(row, 9)
+    def update_tooltips(self, task_id):
+        # Подсказки модель запрашивает сама (task_tooltip) — достаточно перерисовать строку
+        self.task_model.refresh_task(task_id)
 
-        if url_item:
+    def task_tooltip(self, task_id, column):
+        if column == COL_URL:
             from core.cookie_manager import get_cookie_path
-            url = url_item.text()
-            tooltip = get_cookie_path(url)
-            url_item.setToolTip(f"🍪 Cookies path: {tooltip}")
+            return f"🍪 Cookies path: {get_cookie_path(self.task_model.task_value(task_id, COL_URL))}"
 
-        if params_item:
-            params = self.task_params.get(row, {})
+        if column == COL_PARAMS:
+            params = self.task_params.get(task_id, {})
             if not params:
-                params_item.setToolTip("❌ No params set")
-            else:
-                desc = []
-                if params.get("proxy"):
-                    desc.append(f"Proxy: {params['proxy']}")
-                if params.get("user_agent"):
-                    desc.append(f"UA: {params['user_agent'][:40]}...")
-                if params.get("timeout"):
-                    desc.append(f"Timeout: {params['timeout']}s")
-                if params.get("headers"):
-                    desc.append(f"Headers: {len(params['headers'])} items")
-                params_item.setToolTip(" | ".join(desc))
-
-        if timer_item:
-            seconds = self.task_intervals.get(row, 0)
+                return "❌ No params set"
+            desc = []
+            if params.get("proxy"):
+                desc.append(f"Proxy: {params['proxy']}")
+            if params.get("user_agent"):
+                desc.append(f"UA: {params['user_agent'][:40]}...")
+            if params.get("timeout"):
+                desc.append(f"Timeout: {params['timeout']}s")
+            if params.get("headers"):
+                desc.append(f"Headers: {len(params['headers'])} items")
+            return " | ".join(desc)
+
+        if column == COL_TIMER:
+            seconds = self.task_intervals.get(task_id, 0)
             if seconds:
-                timer_item.setToolTip(f"⏱ Task will auto-run in ~{seconds} sec")
-            else:
-                timer_item.setToolTip("⏹ Timer disabled")
+                return f"⏱ Task will auto-run in ~{seconds} sec"
+            return "⏹ Timer disabled"
+
+        return None
                 
     # SELECTED ROWS WITH CTRL/SHIFT
     # SELECTED ROWS WITH CTRL/SHIFT
     
     def get_selected_rows(self):
-        return list(set(index.row() for index in self.ui.tasks_table.selectedIndexes()))
+        return sorted(set(index.row() for index in self.ui.tasks_table.selectedIndexes()))
+
+    def get_selected_task_ids(self):
+        return self.task_model.task_ids(self.get_selected_rows())
     
     def run_selected_tasks_bulk(self):
-        rows = self.get_selected_rows()
-        for row in rows:
-            self.ui.tasks_table.selectRow(row)  # для совместимости с текущим методом
-            self.run_selected_task()
-            
+        for task_id in self.get_selected_task_ids():
+            self.task_manager.run_task(task_id)
+
+    def reextract_selected_tasks_bulk(self):
+        # Текущие селекторы к сохранённым снимкам страниц — без обращения к сайтам
+        count = self.task_manager.reextract_tasks(self.get_selected_task_ids())
+        self.statusBar().showMessage(f"📦 Разбор снимков: {count} задач", 3000)
+
+    def cancel_selected_tasks_bulk(self):
+        for task_id in self.get_selected_task_ids():
+            self.task_manager.cancel_task(task_id)
+        self.update_lcd()
 
     def delete_selected_tasks_bulk(self):
-        rows = sorted(self.get_selected_rows(), reverse=True)
-        for row in rows:
-            self.ui.tasks_table.removeRow(row)
+        self.forget_tasks(self.task_model.remove_rows(self.get_selected_rows()))
         self.update_lcd()
         
         
+    def export_session_columnar(self):
+        """Все результаты сессии одним колоночным файлом (Parquet / Arrow) для аналитики"""
+        self.export_results_bulk(self.task_model.store.ids(), "Экспорт результатов сессии",
+                                 "Parquet (*.parquet);;Arrow / Feather (*.feather)")
+
     def save_selected_results_bulk(self):
-        rows = self.get_selected_rows()
-        for row in rows:
-            self.save_task_result(row)
-            
+        # Один файл на все выделенные задачи (формат — по расширению)
+        self.export_results_bulk(self.get_selected_task_ids(), "Сохранить выделенные результаты", EXPORT_FILTERS)
+
+    def export_results_bulk(self, task_ids, title, filters):
+        """Пишет результаты задач в один файл в фоновом потоке, с прогрессом и отменой"""
+        if self.export_worker and self.export_worker.isRunning():
+            self.statusBar().showMessage("⚠ Экспорт уже выполняется")
+            return
+
+        tasks = [self.task_results[task_id] for task_id in task_ids if self.task_results.get(task_id)]
+        if not tasks:
+            self.statusBar().showMessage("⚠ Нет данных для сохранения")
+            return
+
+        file_path, _ = QFileDialog.getSaveFileName(self, title, "", filters)
+        if not file_path:
+            return
+
+        progress = QProgressDialog(f"Экспорт {len(tasks)} задач…", "Отмена", 0, 0, self)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(300)
+
+        worker = ExportWorker(tasks, file_path)
+        worker.progress.connect(lambda done, total: (progress.setMaximum(max(total, 1)), progress.setValue(done)))
+        worker.exported.connect(lambda path: self.statusBar().showMessage(f"✅ Сохранено: {path}"))
+        worker.failed.connect(lambda message: self.statusBar().showMessage(
+            f"❌ Ошибка экспорта: {message}" if message else "⏹ Экспорт отменён"))
+        worker.finished.connect(progress.reset)
+        worker.finished.connect(progress.deleteLater)
+        progress.canceled.connect(worker.requestInterruption)
+
+        self.export_worker = worker
+        worker.start()
+
     # SAVE COLUMN WIDTH
             
     def save_column_widths(self):
         settings = load_settings()
         widths = {}
 
-        for col in range(self.ui.tasks_table.columnCount()):
+        for col in range(self.task_model.columnCount()):
             widths[str(col)] = self.ui.tasks_table.columnWidth(col)
 
         settings["column_widths"] = widths
@@ -553,7 +650,7 @@ class ScraperApp(QMainWindow):
 
         for col_str, width in widths.items():
             col = int(col_str)
-            if 0 <= col < self.ui.tasks_table.columnCount():
+            if 0 <= col < self.task_model.columnCount():
                 self.ui.tasks_table.setColumnWidth(col, width)
 
             
@@ -561,20 +658,28 @@ class ScraperApp(QMainWindow):
     
     def closeEvent(self, event):
         self.save_column_widths()
+        self.autosave_timer.stop()
+        self.session_controller.wait_autosave()
+        self.task_manager.shutdown()
+        if self.export_worker:
+            # Незавершённый экспорт отменяется (недописанный файл удалит сам воркер)
+            self.export_worker.requestInterruption()
+            self.export_worker.wait()
+        http_client.registry.close_all()
         event.accept()
         
     # ANALYTICS QDIALOG
     
     def run_analytics_dialog(self):
-        rows = self.get_selected_rows()
-        if not rows:
+        task_ids = self.get_selected_task_ids()
+        if not task_ids:
             self.statusBar().showMessage("⚠ Выберите задачи для анализа")
             return
 
-        dialog = AnalyticsDialog(self, rows=rows, task_results=self.task_results)
+        dialog = AnalyticsDialog(self, rows=task_ids, task_results=self.task_results)
         dialog.exec_()
 
 
     def open_calendar_dialog(self):
-        dialog = CalendarDialog(self, self.task_results, self.restore_session)
+        dialog = CalendarDialog(self, self.task_results, self.restore_session, self.task_model.row_of)
         dialog.exec_()
\ No newline at end of file
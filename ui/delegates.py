@@ -0,0 +1,35 @@
+# ui/delegates.py
+
+from PyQt5.QtCore import Qt, QEvent, QSize, pyqtSignal
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyleOptionButton, QStyle, QApplication
+
+
+class ButtonDelegate(QStyledItemDelegate):
+    """Рисует кнопку в ячейке вместо QPushButton на каждую строку; клик — сигнал clicked(row)"""
+
+    clicked = pyqtSignal(int)
+
+    def __init__(self, text, parent=None):
+        super().__init__(parent)
+        self.text = text
+
+    def paint(self, painter, option, index):
+        button = QStyleOptionButton()
+        button.rect = option.rect.adjusted(2, 2, -2, -2)
+        button.text = self.text
+        button.state = QStyle.State_Enabled | QStyle.State_Raised
+
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.CE_PushButton, button, painter, option.widget)
+
+    def sizeHint(self, option, index):
+        # Ширина по тексту кнопки — чтобы resizeColumnsToContents не сжимал колонку
+        width = option.fontMetrics.horizontalAdvance(self.text) + 24
+        return super().sizeHint(option, index).expandedTo(QSize(width, 0))
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            if option.rect.contains(event.pos()):
+                self.clicked.emit(index.row())
+                return True
+        return False
@@ -1,6 +1,15 @@
-from PyQt5.QtWidgets import QLineEdit, QComboBox, QDialog, QVBoxLayout, QTextEdit, QPushButton, QTableWidgetItem
+from PyQt5.QtWidgets import QLineEdit, QComboBox, QDialog, QVBoxLayout, QTextEdit, QPushButton
+from core import selector_cache
+from core.scraper import parse_selectors
+
+# table — QTableView с ui.task_model.TaskTableModel; редактор ставится
+# поверх ячейки через setIndexWidget только на время правки
 
 def edit_cell(parent, table, row, column):
+    # Задача выполняется — URL / селектор / метод не редактируются
+    if table.model().is_locked(row):
+        return
+
     if column == 1:
         edit_url_cell(parent, table, row, column)
     elif column == 2:
@@ -9,45 +18,49 @@ def edit_cell(parent, table, row, column):
         edit_method_cell(parent, table, row, column)
 
 def edit_url_cell(parent, table, row, column):
-    item = table.item(row, column)
-    if not item:
-        return
+    model = table.model()
     editor = QLineEdit(parent)
-    editor.setText(item.text())
-    table.setCellWidget(row, column, editor)
+    editor.setText(model.value(row, column))
+    table.setIndexWidget(model.index(row, column), editor)
     editor.editingFinished.connect(lambda: finish_edit_url(table, row, column, editor))
     editor.setFocus()
 
 def finish_edit_url(table, row, column, editor):
+    model = table.model()
     new_value = editor.text()
-    table.setItem(row, column, QTableWidgetItem(new_value))
-    table.setCellWidget(row, column, None)
+    model.set_value(row, column, new_value)
+    table.setIndexWidget(model.index(row, column), None)
 
 def edit_method_cell(parent, table, row, column):
+    model = table.model()
     combo = QComboBox(parent)
     combo.addItems(["CSS", "XPath"])
-    current = table.item(row, column)
-    if current:
-        index = combo.findText(current.text())
-        if index >= 0:
-            combo.setCurrentIndex(index)
+    index = combo.findText(model.value(row, column))
+    if index >= 0:
+        combo.setCurrentIndex(index)
     combo.currentIndexChanged.connect(lambda: finish_edit_method(table, row, column, combo))
-    table.setCellWidget(row, column, combo)
+    table.setIndexWidget(model.index(row, column), combo)
 
 def finish_edit_method(table, row, column, combo):
+    model = table.model()
     value = combo.currentText()
-    table.setItem(row, column, QTableWidgetItem(value))
-    table.setCellWidget(row, column, None)
+    old_value = model.value(row, column)
+    if old_value != value:
+        for _, old_selector in parse_selectors(model.value(row, 2)):
+            selector_cache.invalidate(old_selector, old_value)
+    model.set_value(row, column, value)
+    table.setIndexWidget(model.index(row, column), None)
 
 def edit_selector_modal(parent, table, row, column):
-    current = table.item(row, column)
-    text = current.text() if current else ""
+    model = table.model()
+    text = model.value(row, column)
 
     dialog = QDialog(parent)
     dialog.setWindowTitle("Редактировать селектор")
     layout = QVBoxLayout(dialog)
 
     editor = QTextEdit()
+    editor.setPlaceholderText("a.title\nили несколько полей, по одному на строку:\ntitle = h1\nlinks = a.more")
     editor.setPlainText(text)
     layout.addWidget(editor)
 
@@ -57,4 +70,8 @@ def edit_selector_modal(parent, table, row, column):
 
     if dialog.exec_():
         new_value = editor.toPlainText().strip()
-        table.setItem(row, column, QTableWidgetItem(new_value))
+        if new_value != text:
+            # Старые скомпилированные селекторы больше не нужны
+            for _, old_selector in parse_selectors(text):
+                selector_cache.invalidate(old_selector)
+        model.set_value(row, column, new_value)
@@ -143,33 +143,9 @@ class Ui_MainWindow(object):
         self.tabWidget.setObjectName("tabWidget")
         self.tab = QtWidgets.QWidget()
         self.tab.setObjectName("tab")
-        self.tasks_table = QtWidgets.QTableWidget(self.tab)
+        self.tasks_table = QtWidgets.QTableView(self.tab)
         self.tasks_table.setGeometry(QtCore.QRect(0, 0, 1331, 701))
         self.tasks_table.setObjectName("tasks_table")
-        self.tasks_table.setColumnCount(11)
-        self.tasks_table.setRowCount(0)
-        item = QtWidgets.QTableWidgetItem()
-        self.tasks_table.setHorizontalHeaderItem(0, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tasks_table.setHorizontalHeaderItem(1, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tasks_table.setHorizontalHeaderItem(2, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tasks_table.setHorizontalHeaderItem(3, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tasks_table.setHorizontalHeaderItem(4, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tasks_table.setHorizontalHeaderItem(5, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tasks_table.setHorizontalHeaderItem(6, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tasks_table.setHorizontalHeaderItem(7, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tasks_table.setHorizontalHeaderItem(8, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tasks_table.setHorizontalHeaderItem(9, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tasks_table.setHorizontalHeaderItem(10, item)
         self.tabWidget.addTab(self.tab, "")
         self.tab_2 = QtWidgets.QWidget()
         self.tab_2.setObjectName("tab_2")
@@ -247,14 +223,17 @@ class Ui_MainWindow(object):
         self.lcd_running.setGeometry(QtCore.QRect(1330, 90, 64, 23))
         self.lcd_running.setObjectName("lcd_running")
         self.lcd_success = QtWidgets.QLCDNumber(self.centralwidget)
-        self.lcd_success.setGeometry(QtCore.QRect(1330, 150, 64, 23))
+        self.lcd_success.setGeometry(QtCore.QRect(1330, 210, 64, 23))
         self.lcd_success.setObjectName("lcd_success")
         self.lcd_error = QtWidgets.QLCDNumber(self.centralwidget)
-        self.lcd_error.setGeometry(QtCore.QRect(1330, 210, 64, 23))
+        self.lcd_error.setGeometry(QtCore.QRect(1330, 270, 64, 23))
         self.lcd_error.setObjectName("lcd_error")
         self.lcd_stopped = QtWidgets.QLCDNumber(self.centralwidget)
-        self.lcd_stopped.setGeometry(QtCore.QRect(1330, 270, 64, 23))
+        self.lcd_stopped.setGeometry(QtCore.QRect(1330, 330, 64, 23))
         self.lcd_stopped.setObjectName("lcd_stopped")
+        self.lcd_queued = QtWidgets.QLCDNumber(self.centralwidget)
+        self.lcd_queued.setGeometry(QtCore.QRect(1330, 150, 64, 23))
+        self.lcd_queued.setObjectName("lcd_queued")
         self.label_Task = QtWidgets.QLabel(self.centralwidget)
         self.label_Task.setGeometry(QtCore.QRect(1400, 30, 81, 21))
         self.label_Task.setObjectName("label_Task")
@@ -262,14 +241,17 @@ class Ui_MainWindow(object):
         self.label_Process.setGeometry(QtCore.QRect(1400, 90, 81, 21))
         self.label_Process.setObjectName("label_Process")
         self.label_Sucessfull = QtWidgets.QLabel(self.centralwidget)
-        self.label_Sucessfull.setGeometry(QtCore.QRect(1400, 150, 81, 21))
+        self.label_Sucessfull.setGeometry(QtCore.QRect(1400, 210, 81, 21))
         self.label_Sucessfull.setObjectName("label_Sucessfull")
         self.label_Error = QtWidgets.QLabel(self.centralwidget)
-        self.label_Error.setGeometry(QtCore.QRect(1400, 210, 81, 21))
+        self.label_Error.setGeometry(QtCore.QRect(1400, 270, 81, 21))
         self.label_Error.setObjectName("label_Error")
         self.label_Stoped = QtWidgets.QLabel(self.centralwidget)
-        self.label_Stoped.setGeometry(QtCore.QRect(1400, 270, 81, 21))
+        self.label_Stoped.setGeometry(QtCore.QRect(1400, 330, 81, 21))
         self.label_Stoped.setObjectName("label_Stoped")
+        self.label_Queued = QtWidgets.QLabel(self.centralwidget)
+        self.label_Queued.setGeometry(QtCore.QRect(1400, 150, 81, 21))
+        self.label_Queued.setObjectName("label_Queued")
         MainWindow.setCentralWidget(self.centralwidget)
         self.toolBar = QtWidgets.QToolBar(MainWindow)
         self.toolBar.setObjectName("toolBar")
@@ -323,28 +305,6 @@ class Ui_MainWindow(object):
     def retranslateUi(self, MainWindow):
         _translate = QtCore.QCoreApplication.translate
         MainWindow.setWindowTitle(_translate("MainWindow", "MainWindow"))
-        item = self.tasks_table.horizontalHeaderItem(0)
-        item.setText(_translate("MainWindow", "№"))
-        item = self.tasks_table.horizontalHeaderItem(1)
-        item.setText(_translate("MainWindow", "URL"))
-        item = self.tasks_table.horizontalHeaderItem(2)
-        item.setText(_translate("MainWindow", "Selectors"))
-        item = self.tasks_table.horizontalHeaderItem(3)
-        item.setText(_translate("MainWindow", "Methode"))
-        item = self.tasks_table.horizontalHeaderItem(4)
-        item.setText(_translate("MainWindow", "Status"))
-        item = self.tasks_table.horizontalHeaderItem(5)
-        item.setText(_translate("MainWindow", "Action"))
-        item = self.tasks_table.horizontalHeaderItem(6)
-        item.setText(_translate("MainWindow", "Save"))
-        item = self.tasks_table.horizontalHeaderItem(7)
-        item.setText(_translate("MainWindow", "Cookies"))
-        item = self.tasks_table.horizontalHeaderItem(8)
-        item.setText(_translate("MainWindow", "Params"))
-        item = self.tasks_table.horizontalHeaderItem(9)
-        item.setText(_translate("MainWindow", "Timer"))
-        item = self.tasks_table.horizontalHeaderItem(10)
-        item.setText(_translate("MainWindow", "Last Run"))
         self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab), _translate("MainWindow", "Tasks"))
         self.label_4.setText(_translate("MainWindow", "Save parsed data"))
         self.export_button.setText(_translate("MainWindow", "Export"))
@@ -371,6 +331,7 @@ class Ui_MainWindow(object):
         self.label_Sucessfull.setText(_translate("MainWindow", "Sucessfull"))
         self.label_Error.setText(_translate("MainWindow", "ERROR"))
         self.label_Stoped.setText(_translate("MainWindow", "Stoped"))
+        self.label_Queued.setText(_translate("MainWindow", "In Queue"))
         self.toolBar.setWindowTitle(_translate("MainWindow", "toolBar"))
         self.action_add_task_2.setText(_translate("MainWindow", "+ Add Task"))
         self.action_add_task_2.setToolTip(_translate("MainWindow", "Add Task"))
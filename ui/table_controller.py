@@ -1,35 +1,40 @@
 # ui/table_controller.py
 
-from PyQt5.QtWidgets import QTableWidgetItem
-from PyQt5.QtCore import Qt
-from ui.table_utils import colorize_row_by_status
+from ui.task_model import COL_URL, COL_SELECTOR, COL_STATUS, COL_LAST_RUN
+
 
 class TableController:
     def __init__(self, table_widget, task_params):
         self.table = table_widget
         self.task_params = task_params
 
+    @property
+    def model(self):
+        return self.table.model()
+
     def get_task_data(self, row: int) -> dict:
         """Возвращает данные строки таблицы как словарь"""
-        get_text = lambda col: self.table.item(row, col).text().strip() if self.table.item(row, col) else ""
+        return self.get_record_data(self.model.store.at(row))
 
+    def get_record_data(self, record) -> dict:
+        """То же по записи core.task_store.TaskRecord — без обращения к ячейкам"""
         return {
-            "url": get_text(1),
-            "selector": get_text(2),
-            "method": get_text(3),
-            "status": get_text(4),
-            "params": self.task_params.get(row, {}),
-            "last_run": get_text(10)
+            "task_id": record.task_id,
+            "url": record.url.strip(),
+            "selector": record.selector.strip(),
+            "method": record.method.strip(),
+            "status": record.status.strip(),
+            "params": self.task_params.get(record.task_id, {}),
+            "last_run": record.last_run.strip()
         }
 
     def update_row_status(self, row: int, status: str):
-        """Обновляет статус и перекрашивает строку"""
-        self.table.setItem(row, 4, QTableWidgetItem(status))
-        colorize_row_by_status(self.table, row)
+        """Обновляет статус (цвет строки модель пересчитает сама)"""
+        self.model.set_value(row, COL_STATUS, status)
 
     def set_last_run(self, row: int, time_str: str):
         """Устанавливает значение в колонке Last Run"""
-        self.table.setItem(row, 10, QTableWidgetItem(time_str))
+        self.model.set_value(row, COL_LAST_RUN, time_str)
 
     def apply_filters(self, filters: list):
         """
@@ -37,20 +42,19 @@ class TableController:
         Пример: [("URL", "cnn"), ("Status", "Ошибка")]
         """
         col_map = {
-            "URL": 1,
-            "Selector": 2,
-            "Status": 4,
-            "Last Run": 10
+            "URL": COL_URL,
+            "Selector": COL_SELECTOR,
+            "Status": COL_STATUS,
+            "Last Run": COL_LAST_RUN
         }
 
-        for row in range(self.table.rowCount()):
+        for row in range(self.model.rowCount()):
             match = True
             for field, value in filters:
                 col = col_map.get(field)
                 if col is None:
                     continue
-                item = self.table.item(row, col)
-                if not item or value.lower() not in item.text().lower():
+                if value.lower() not in self.model.value(row, col).lower():
                     match = False
                     break
             self.table.setRowHidden(row, not match)
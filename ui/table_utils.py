@@ -1,85 +1,41 @@
-from PyQt5.QtGui import QColor
-from PyQt5.QtWidgets import QTableWidgetItem, QPushButton
-
-
 # === LCD + ЦВЕТ ===
-
-def update_lcd_counters(table, lcds):
-    total = table.rowCount()
-    running = count_status(table, "⏳ Выполняется")
-    success = count_status(table, "✅ Успешно")
-    error = count_status(table, "❌ Ошибка")
-    stopped = count_status(table, "⏸️ Остановлено")
+# Таблица задач — QTableView + ui.task_model.TaskTableModel; функции принимают модель
+
+def update_lcd_counters(model, lcds):
+    # Счётчики ведёт модель на переходах статусов — таблица не сканируется
+    counts = model.status_counts()
+    total = model.rowCount()
+    running = counts.get("⏳ Выполняется", 0)
+    success = counts.get("✅ Успешно", 0) + counts.get("✅ Без изменений", 0)
+    error = counts.get("❌ Ошибка", 0)
+    stopped = counts.get("⏸️ Остановлено", 0)
+    queued = counts.get("🕓 В очереди", 0)
 
     lcds['total'].display(total)
     lcds['running'].display(running)
     lcds['success'].display(success)
     lcds['error'].display(error)
     lcds['stopped'].display(stopped)
-    
-    # 🔥 Добавляем окраску строк
-    for row in range(table.rowCount()):
-        colorize_row_by_status(table, row)
-
-def count_status(table, status_text):
-    count = 0
-    for row in range(table.rowCount()):
-        item = table.item(row, 4)
-        if item and item.text() == status_text:
-            count += 1
-    return count
+    if 'queued' in lcds:
+        lcds['queued'].display(queued)
 
-def colorize_row_by_status(table, row):
-    status_item = table.item(row, 4)
-    if not status_item:
-        return
+def count_status(model, status_text):
+    return model.count_status(status_text)
 
-    status = status_item.text().strip()
-    color = QColor("white")  # Default
+def colorize_row_by_status(model, row):
+    # Цвет строки модель отдаёт сама (BackgroundRole по статусу) — достаточно перерисовки
+    if 0 <= row < model.rowCount():
+        model.refresh_row(row)
 
-    if "✅" in status:
-        color = QColor("lightgreen")
-    elif "❌" in status:
-        color = QColor("lightcoral")
-    elif "⏳" in status:
-        color = QColor("lightyellow")
-    elif "⏸" in status:
-        color = QColor("lightgray")
-
-    for col in range(table.columnCount()):
-        item = table.item(row, col)
-        if item:
-            item.setBackground(color)
-            
 # === ДОБАВЛЕНИЕ / УДАЛЕНИЕ ===
-            
-def add_task_row(table, url, selector, method, status):
-    row_position = table.rowCount()
-    table.insertRow(row_position)
-
-    table.setItem(row_position, 0, QTableWidgetItem(str(row_position + 1)))  # №
-    table.setItem(row_position, 1, QTableWidgetItem(url))                   # URL
-    table.setItem(row_position, 2, QTableWidgetItem(selector))             # Selector
-    table.setItem(row_position, 3, QTableWidgetItem(method))               # Method
-    table.setItem(row_position, 4, QTableWidgetItem(status))               # Status
-    table.setItem(row_position, 5, QTableWidgetItem("..."))                # Action placeholder
-    table.setItem(row_position, 8, QTableWidgetItem("🛠 Настроить"))
 
-    # ❗ Важно: Кнопку сохранения добавляет ScraperApp
-    # через table.setCellWidget(row, 6, create_save_button())
-     # 🔄 Автоматическая ширина колонок по содержимому
-    for col in range(table.columnCount()):
-        table.resizeColumnToContents(col)
+def add_task_row(model, url, selector, method, status):
+    # Возвращает task_id новой задачи. Кнопки Save / Cookies рисуют делегаты (ui/delegates.py), виджеты на строку не создаются
+    return model.add_task(url, selector, method, status)
 
-def delete_selected_row(table):
-    selected = table.currentRow()
+def delete_selected_row(view):
+    """Удаляет текущую строку, возвращает task_id удалённых задач"""
+    selected = view.currentIndex().row()
     if selected >= 0:
-        table.removeRow(selected)
-        renumber_tasks(table)
-
-def renumber_tasks(table):
-    for i in range(table.rowCount()):
-        table.setItem(i, 0, QTableWidgetItem(str(i + 1)))
-
-def create_save_button():
-    return QPushButton("💾 Сохранить")
+        return view.model().remove_rows([selected])
+    return []
@@ -0,0 +1,208 @@
+# ui/task_model.py
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QColor
+
+from core.task_store import TaskStore
+
+COLUMN_HEADERS = ["№", "URL", "Selectors", "Methode", "Status", "Action", "Save", "Cookies", "Params", "Timer", "Last Run"]
+
+# Колонки таблицы
+(COL_NUMBER, COL_URL, COL_SELECTOR, COL_METHOD, COL_STATUS, COL_ACTION,
+ COL_SAVE, COL_COOKIES, COL_PARAMS, COL_TIMER, COL_LAST_RUN) = range(len(COLUMN_HEADERS))
+
+# Колонка -> поле core.task_store.TaskRecord; колонки №/Action/Save вычисляются
+COLUMN_FIELDS = {
+    COL_URL: "url",
+    COL_SELECTOR: "selector",
+    COL_METHOD: "method",
+    COL_STATUS: "status",
+    COL_COOKIES: "cookies_file",
+    COL_PARAMS: "params_label",
+    COL_TIMER: "timer_label",
+    COL_LAST_RUN: "last_run",
+}
+
+STATUS_COLORS = [
+    ("✅", QColor("lightgreen")),
+    ("❌", QColor("lightcoral")),
+    ("⏳", QColor("lightyellow")),
+    ("⏸", QColor("lightgray")),
+    ("🕓", QColor("lightcyan")),
+]
+DEFAULT_COLOR = QColor("white")
+
+
+def status_color(status):
+    for marker, color in STATUS_COLORS:
+        if marker in status:
+            return color
+    return DEFAULT_COLOR
+
+
+class TaskTableModel(QAbstractTableModel):
+    """
+    Модель таблицы задач — представление над core.task_store.TaskStore.
+    Без QTableWidgetItem и виджетов на ячейку; кнопки рисуют делегаты.
+    Строковые методы (row) — для кода представления, *_task (task_id) — для остального.
+    """
+
+    def __init__(self, store=None, parent=None):
+        super().__init__(parent)
+        self.store = store if store is not None else TaskStore()
+        self.tooltip_provider = None  # callable(task_id, column) -> str
+
+    # ============================
+    # 🔹 Qt API
+    # ============================
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.store)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMN_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMN_HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index):
+        # Редактирование идёт через свои редакторы (ui/editor_handlers.py)
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row, column = index.row(), index.column()
+
+        if role == Qt.DisplayRole:
+            return self.value(row, column)
+        if role == Qt.BackgroundRole:
+            return status_color(self.store.at(row).status)
+        if role == Qt.ToolTipRole and self.tooltip_provider:
+            return self.tooltip_provider(self.store.id_at(row), column) or None
+        return None
+
+    # ============================
+    # 🔹 Доступ по строке
+    # ============================
+
+    def task_id(self, row):
+        return self.store.id_at(row)
+
+    def task_ids(self, rows):
+        return [self.store.id_at(row) for row in rows if 0 <= row < len(self.store)]
+
+    def row_of(self, task_id):
+        return self.store.row_of(task_id)
+
+    def value(self, row, column):
+        if column == COL_NUMBER:
+            return str(row + 1)
+        if column == COL_ACTION:
+            return "..."
+        field = COLUMN_FIELDS.get(column)
+        if field is None:
+            return ""
+        return getattr(self.store.at(row), field)
+
+    def set_value(self, row, column, text):
+        task_id = self.store.id_at(row)
+        if task_id is not None:
+            self.set_task_value(task_id, column, text)
+
+    def refresh_row(self, row):
+        if 0 <= row < len(self.store):
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(COLUMN_HEADERS) - 1))
+
+    def is_locked(self, row):
+        return 0 <= row < len(self.store) and self.store.at(row).locked
+
+    # ============================
+    # 🔹 Доступ по task_id
+    # ============================
+
+    def task_value(self, task_id, column):
+        record = self.store.get(task_id)
+        field = COLUMN_FIELDS.get(column)
+        if record is None or field is None:
+            return ""
+        return getattr(record, field)
+
+    def set_task_value(self, task_id, column, text):
+        field = COLUMN_FIELDS.get(column)
+        if field is None or not self.store.update(task_id, field, text):
+            return
+
+        row = self.store.row_of(task_id)
+        if column == COL_STATUS:
+            # Статус меняет цвет всей строки
+            self.refresh_row(row)
+        else:
+            index = self.index(row, column)
+            self.dataChanged.emit(index, index)
+
+    def set_locked(self, task_id, locked=True):
+        record = self.store.get(task_id)
+        if record is not None:
+            record.locked = locked
+
+    def refresh_task(self, task_id):
+        self.refresh_row(self.store.row_of(task_id))
+
+    # ============================
+    # 🔹 Добавление / удаление
+    # ============================
+
+    def add_task(self, url, selector, method, status):
+        """Добавляет задачу в конец таблицы, возвращает её task_id"""
+        row = len(self.store)
+        self.beginInsertRows(QModelIndex(), row, row)
+        record = self.store.add(url, selector, method, status)
+        self.endInsertRows()
+        return record.task_id
+
+    def add_tasks(self, items):
+        """Добавляет сразу много задач (словари для TaskStore.add) одним событием вставки"""
+        if not items:
+            return []
+        first = len(self.store)
+        self.beginInsertRows(QModelIndex(), first, first + len(items) - 1)
+        records = self.store.add_many(items)
+        self.endInsertRows()
+        return [record.task_id for record in records]
+
+    def remove_rows(self, rows):
+        """Удаляет строки по индексам, возвращает task_id удалённых задач"""
+        ordered = sorted(set(row for row in rows if 0 <= row < len(self.store)))
+        if not ordered:
+            return []
+        task_ids = self.task_ids(ordered)
+        # Непрерывный участок — одно событие, иначе проще сбросить модель
+        if ordered[-1] - ordered[0] + 1 == len(ordered):
+            self.beginRemoveRows(QModelIndex(), ordered[0], ordered[-1])
+            self.store.remove(task_ids)
+            self.endRemoveRows()
+        else:
+            self.beginResetModel()
+            self.store.remove(task_ids)
+            self.endResetModel()
+        return task_ids
+
+    def clear(self):
+        self.beginResetModel()
+        self.store.clear()
+        self.endResetModel()
+
+    # ============================
+    # 🔹 Счётчики статусов
+    # ============================
+
+    def count_status(self, status_text):
+        """O(1): число строк с данным статусом (индекс TaskStore)"""
+        return self.store.count_status(status_text)
+
+    def status_counts(self):
+        return self.store.status_counts()